@@ -8,6 +8,7 @@ import platform
 # not sure what this brings us...
 
 from . import import_fcstd
+from . import blender_helper as b_helper
 
 bl_info = {
     "name": "FreeBImport v02",
@@ -24,6 +25,29 @@ bl_info = {
 # brut force path loading:
 # import sys; sys.path.append("/path/to/FreeCAD.so")
 
+# non-blocking import:
+# timer interval and time spent importing per timer event (in seconds)
+MODAL_TIMER_INTERVAL = 0.01
+MODAL_TIME_BUDGET = 0.1
+# events passed on during the import (viewport navigation).
+# everything else (editing, undo / redo, ...) is blocked
+# as it would change the data the importer works on.
+MODAL_PASS_THROUGH_EVENTS = {
+    "MOUSEMOVE",
+    "INBETWEEN_MOUSEMOVE",
+    "MIDDLEMOUSE",
+    "WHEELUPMOUSE",
+    "WHEELDOWNMOUSE",
+    "WHEELINMOUSE",
+    "WHEELOUTMOUSE",
+    "TRACKPADPAN",
+    "TRACKPADZOOM",
+    "NDOF_MOTION",
+    "TIMER",
+}
+
+log = b_helper.get_logger(__name__)
+
 
 # ==============================================================================
 # Blender Operator class
@@ -71,6 +95,22 @@ class IMPORT_OT_FreeCAD_Preferences(bpy.types.AddonPreferences):
         ),
         default=_default_system_packages,
     )
+    tessellation_cache_dir: bpy.props.StringProperty(
+        subtype="DIR_PATH",
+        name="Tessellation cache",
+        description=(
+            "Directory to store tessellation results. \n"
+            "Unchanged objects are not tessellated again on re-import. \n"
+            "Leave empty to disable the cache"
+        ),
+        default="",
+    )
+    tessellation_cache_size: bpy.props.IntProperty(
+        name="Tessellation cache size (MB)",
+        description="Least recently used entries are removed above this size",
+        default=1024,
+        min=1,
+    )
 
     def draw(self, context):
         """Draw Preferences."""
@@ -85,6 +125,9 @@ class IMPORT_OT_FreeCAD_Preferences(bpy.types.AddonPreferences):
         layout.prop(self, "filepath_freecad")
         layout.prop(self, "filepath_system_packages")
         layout.separator()
+        layout.prop(self, "tessellation_cache_dir")
+        layout.prop(self, "tessellation_cache_size")
+        layout.separator()
         layout.label(text="Report bugs or issues:")
         layout.operator("wm.url_open", text="Open GitHub Issues Page").url = "https://github.com/tankshield/FreeBimport"
 
@@ -140,6 +183,58 @@ class IMPORT_OT_FreeCAD(bpy.types.Operator):
             "Only replace the geometry if the the source in FreeCAD has changed."
         ),
     )
+    option_recompute: bpy.props.EnumProperty(
+        name="Recompute",
+        items=(
+            ("NEVER", "Never", "Use the shapes as saved in the FreeCAD file"),
+            (
+                "TOUCHED",
+                "Touched / invalid objects",
+                "Only recompute objects that are touched or invalid "
+                "(and their dependencies)",
+            ),
+            ("FULL", "Full", "Recompute the whole document"),
+        ),
+        default="TOUCHED",
+        description="Recompute the FreeCAD document after opening",
+    )
+    option_modal: bpy.props.BoolProperty(
+        name="Non-blocking import",
+        default=True,
+        description=(
+            "Import the objects step by step and keep blender responsive. "
+            "Shows the progress - press ESC to cancel "
+            "(the already imported objects are kept)"
+        ),
+    )
+    option_verbosity: bpy.props.EnumProperty(
+        name="Verbosity",
+        items=(
+            ("ERROR", "Errors", "Only report errors"),
+            ("WARNING", "Warnings", "Report errors and warnings"),
+            ("INFO", "Info", "Report the import progress"),
+            ("DEBUG", "Debug", "Print the whole object tree (slow for big files)"),
+        ),
+        default="INFO",
+        description="Amount of messages printed to the console during import",
+    )
+    option_profile: bpy.props.BoolProperty(
+        name="Profile import",
+        default=False,
+        description=(
+            "Measure the import phases and objects. "
+            "Reports a summary and writes it as JSON file next to the .blend"
+        ),
+    )
+    option_trace: bpy.props.BoolProperty(
+        name="Record trace",
+        default=False,
+        description=(
+            "Record trace events of the whole import "
+            "and write them as Chrome trace JSON file next to the .blend "
+            "(open in chrome://tracing, Perfetto or speedscope)"
+        ),
+    )
     option_placement: bpy.props.BoolProperty(
         name="Use Placements",
         default=True,
@@ -148,12 +243,77 @@ class IMPORT_OT_FreeCAD(bpy.types.Operator):
     option_tessellation: bpy.props.FloatProperty(
         name="Tessellation value",
         default=0.10,
+        min=0.001,
         description="The tessellation value to apply when triangulating shapes",
     )
+    option_tessellation_adaptive: bpy.props.BoolProperty(
+        name="Adaptive tessellation",
+        default=False,
+        description=(
+            "Derive the tessellation of every object from its size "
+            "(bounding box diagonal) instead of the fixed tessellation value"
+        ),
+    )
+    option_tessellation_relative: bpy.props.FloatProperty(
+        name="Relative tessellation",
+        default=0.01,
+        min=0.0001,
+        max=0.5,
+        precision=4,
+        description="Adaptive tessellation: deflection as fraction of the object size",
+    )
+    option_tessellation_min: bpy.props.FloatProperty(
+        name="Minimal tessellation",
+        default=0.01,
+        min=0.001,
+        description="Adaptive tessellation: smallest deflection (in FreeCAD units)",
+    )
+    option_tessellation_max: bpy.props.FloatProperty(
+        name="Maximal tessellation",
+        default=5.0,
+        min=0.001,
+        description="Adaptive tessellation: biggest deflection (in FreeCAD units)",
+    )
+    option_weld_tolerance: bpy.props.FloatProperty(
+        name="Weld tolerance",
+        default=0.00001,
+        min=0.0,
+        precision=6,
+        description=(
+            "Merge vertices closer than this distance (in FreeCAD units). "
+            "This connects the faces of a shape. Set to 0 to only merge identical vertices"
+        ),
+    )
     option_triangulate_meshes: bpy.props.BoolProperty(
         name="Triangulate meshes",
         default=False,
-        description="Triangulate all faces during import (may lose multi-material info)",
+        description=(
+            "Triangulate all faces during import "
+            "(needs MeshPart to keep per-face materials - "
+            "without it multi-material info may be lost)"
+        ),
+    )
+    option_use_workers: bpy.props.BoolProperty(
+        name="Tessellate in worker processes",
+        default=False,
+        description=(
+            "Tessellate the shapes in parallel FreeCAD processes outside of Blender. "
+            "Uses all cores for large assemblies"
+        ),
+    )
+    option_worker_count: bpy.props.IntProperty(
+        name="Worker processes",
+        default=0,
+        min=0,
+        description="Number of tessellation worker processes (0 = one per CPU core)",
+    )
+    option_concurrent_files: bpy.props.BoolProperty(
+        name="Tessellate files concurrently",
+        default=False,
+        description=(
+            "If multiple files are selected: tessellate the next files "
+            "in worker processes (one per file) while the current file is imported"
+        ),
     )
     option_cleanup_after_import: bpy.props.BoolProperty(
         name="Cleanup after import",
@@ -237,7 +397,7 @@ class IMPORT_OT_FreeCAD(bpy.types.Operator):
 
     def get_preferences(self):
         """Get addon preferences."""
-        print("__package__: '{}'".format(__package__))
+        log.debug("__package__: '{}'", __package__)
         user_preferences = bpy.context.preferences
         addon_prefs = user_preferences.addons[__package__].preferences
         return addon_prefs
@@ -247,7 +407,7 @@ class IMPORT_OT_FreeCAD(bpy.types.Operator):
         # get the FreeCAD path specified in addon preferences
         addon_prefs = self.get_preferences()
         path = addon_prefs.filepath_freecad
-        print("addon_prefs path_to freecad", path)
+        log.debug("addon_prefs path_to freecad {}", path)
         return path
 
     def get_path_to_system_packages(self):
@@ -255,9 +415,16 @@ class IMPORT_OT_FreeCAD(bpy.types.Operator):
         # get the FreeCAD path specified in addon preferences
         addon_prefs = self.get_preferences()
         path = addon_prefs.filepath_system_packages
-        print("addon_prefs path_to system_packages", path)
+        log.debug("addon_prefs path_to system_packages {}", path)
         return path
 
+    def get_tessellation_cache(self):
+        """Get tessellation cache directory and size from addon preferences."""
+        addon_prefs = self.get_preferences()
+        cache_dir = addon_prefs.tessellation_cache_dir
+        log.debug("addon_prefs tessellation_cache_dir {}", cache_dir)
+        return cache_dir, addon_prefs.tessellation_cache_size
+
     # def get_path_to(self, target):
     #     """Get FreeCAD mod path from addon preferences."""
     #     # get the FreeCAD path specified in addon preferences
@@ -267,38 +434,187 @@ class IMPORT_OT_FreeCAD(bpy.types.Operator):
     #     print("addon_prefs path to " + target + " ", path)
     #     return path
 
-    def execute(self, context):
-        """Call when the user is done using the modal file-select window."""
+    def create_importer(self):
+        """Create importer with the options of this operator."""
         path_to_freecad = self.get_path_to_freecad()
         # path_to_system_packages = self.get_path_to("system_packages")
         path_to_system_packages = self.get_path_to_system_packages()
+        cache_dir, cache_max_size = self.get_tessellation_cache()
+        return import_fcstd.ImportFcstd(
+            update=self.option_update,
+            update_only_modified_meshes=self.option_update_only_modified_meshes,
+            placement=self.option_placement,
+            scale=self.option_scale,
+            tessellation=self.option_tessellation,
+            tessellation_adaptive=self.option_tessellation_adaptive,
+            tessellation_relative=self.option_tessellation_relative,
+            tessellation_min=self.option_tessellation_min,
+            tessellation_max=self.option_tessellation_max,
+            weld_tolerance=self.option_weld_tolerance,
+            triangulate_meshes=self.option_triangulate_meshes,
+            use_workers=self.option_use_workers,
+            worker_count=self.option_worker_count,
+            concurrent_files=self.option_concurrent_files,
+            cache_dir=cache_dir,
+            cache_max_size=cache_max_size,
+            cleanup_after_import=self.option_cleanup_after_import,
+            auto_smooth_use=self.option_auto_smooth_use,
+            auto_smooth_angle=self.option_auto_smooth_angle,
+            skiphidden=self.option_skiphidden,
+            filter_sketch=self.option_filter_sketch,
+            sharemats=self.option_sharemats,
+            update_materials=False,
+            recompute=self.option_recompute,
+            profile=self.option_profile,
+            trace=self.option_trace,
+            verbosity=self.option_verbosity,
+            obj_name_prefix=self.option_obj_name_prefix,
+            obj_name_prefix_with_filename=self.option_prefix_with_filename,
+            links_as_collectioninstance=self.option_links_as_col,
+            path_to_freecad=path_to_freecad,
+            path_to_system_packages=path_to_system_packages,
+            report=self.report,
+        )
+
+    def get_filenames(self):
+        """Get full paths of the selected FCStd files."""
         dir = self.directory
+        filenames = []
         for file in self.files:
             filestr = str(file.name)
             if filestr.lower().endswith(".fcstd"):
-                my_importer = import_fcstd.ImportFcstd(
-                    update=self.option_update,
-                    update_only_modified_meshes=self.option_update_only_modified_meshes,
-                    placement=self.option_placement,
-                    scale=self.option_scale,
-                    tessellation=self.option_tessellation,
-                    triangulate_meshes=self.option_triangulate_meshes,
-                    cleanup_after_import=self.option_cleanup_after_import,
-                    auto_smooth_use=self.option_auto_smooth_use,
-                    auto_smooth_angle=self.option_auto_smooth_angle,
-                    skiphidden=self.option_skiphidden,
-                    filter_sketch=self.option_filter_sketch,
-                    sharemats=self.option_sharemats,
-                    update_materials=False,
-                    obj_name_prefix=self.option_obj_name_prefix,
-                    obj_name_prefix_with_filename=self.option_prefix_with_filename,
-                    links_as_collectioninstance=self.option_links_as_col,
-                    path_to_freecad=path_to_freecad,
-                    path_to_system_packages=path_to_system_packages,
-                    report=self.report,
-                )
-                return my_importer.import_fcstd(filename=dir + filestr)
-        return {"FINISHED"}
+                filenames.append(dir + filestr)
+        return filenames
+
+    def execute(self, context):
+        """Call when the user is done using the modal file-select window."""
+        filenames = self.get_filenames()
+        if not filenames:
+            self.report({"WARNING"}, "no FCStd file selected.")
+            return {"CANCELLED"}
+        if self.option_modal and not bpy.app.background and context.window:
+            return self.modal_start(context, filenames)
+        my_importer = self.create_importer()
+        return my_importer.import_files(filenames)
+
+    # non-blocking import
+    # every timer event imports root objects for MODAL_TIME_BUDGET seconds.
+    # opening / recomputing the document still blocks.
+
+    def modal_start(self, context, filenames):
+        """Start non-blocking import."""
+        self._filenames = filenames
+        self._file_index = -1
+        self._importer = self.create_importer()
+        self._importer_active = False
+        self._importer_preparing = False
+        self._importer.prepare_data_index()
+        if self._importer.config["concurrent_files"]:
+            # the first file uses the normal worker setup.
+            self._importer.start_file_workers(filenames[1:])
+        wm = context.window_manager
+        wm.progress_begin(0, 100)
+        self._timer = wm.event_timer_add(MODAL_TIMER_INTERVAL, window=context.window)
+        wm.modal_handler_add(self)
+        return {"RUNNING_MODAL"}
+
+    def modal_stop(self, context, result):
+        """Remove timer and progress."""
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        self._timer = None
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+        self._importer.cancel_file_workers()
+        self._importer.report_file_timings()
+        self._importer = None
+        return result
+
+    def modal_next_file(self):
+        """
+        Begin import of next file.
+
+        returns False if all files are done.
+        """
+        self._importer_active = False
+        while self._file_index + 1 < len(self._filenames):
+            self._file_index += 1
+            result = self._importer.import_begin(
+                self._filenames[self._file_index], wait_for_workers=False
+            )
+            if result is None:
+                self._importer_active = True
+                # the timer polls the tessellation workers
+                self._importer_preparing = True
+                return True
+        return False
+
+    def modal_prepare(self, context):
+        """
+        Wait for the tessellation workers (without blocking).
+
+        returns True if the import is prepared.
+        """
+        if self._importer.workers_running():
+            context.workspace.status_text_set(
+                "FreeCAD import '{}': tessellating in worker processes.. "
+                "(ESC to cancel)".format(self._filenames[self._file_index])
+            )
+            return False
+        self._importer_preparing = False
+        # import_prepare ends the import of this file on errors.
+        self._importer_active = False
+        self._importer.import_prepare()
+        self._importer_active = True
+        return True
+
+    def modal_update_progress(self, context):
+        """Update progress bar and status text."""
+        imported, total = self._importer.get_progress()
+        file_progress = 1.0
+        if total:
+            file_progress = imported / total
+        progress = (self._file_index + file_progress) / len(self._filenames)
+        context.window_manager.progress_update(int(progress * 100))
+        context.workspace.status_text_set(
+            "FreeCAD import '{}': {} / {} root objects (ESC to cancel)".format(
+                self._filenames[self._file_index], imported, total
+            )
+        )
+
+    def modal(self, context, event):
+        """Handle timer and ESC events - pass on viewport navigation."""
+        if event.type == "ESC":
+            if self._importer_active:
+                self._importer.import_end(cancelled=True)
+            if self._file_index < 0:
+                return self.modal_stop(context, {"CANCELLED"})
+            # the already imported objects are kept -
+            # FINISHED pushes the undo step for them.
+            return self.modal_stop(context, {"FINISHED"})
+        if event.type != "TIMER" or event.timer != self._timer:
+            if event.type in MODAL_PASS_THROUGH_EVENTS:
+                return {"PASS_THROUGH"}
+            return {"RUNNING_MODAL"}
+        try:
+            if not self._importer_active:
+                if not self.modal_next_file():
+                    return self.modal_stop(context, {"FINISHED"})
+            if self._importer_preparing and not self.modal_prepare(context):
+                return {"RUNNING_MODAL"}
+            has_more = self._importer.import_step(time_budget=MODAL_TIME_BUDGET)
+            if not has_more:
+                self._importer_active = False
+                self._importer.import_end()
+            else:
+                self.modal_update_progress(context)
+        except Exception as e:
+            self.report({"ERROR"}, "Import Failed.\n" "\n" + str(e))
+            if self._importer_active:
+                self._importer_active = False
+                self._importer.import_end(cancelled=True)
+            return self.modal_stop(context, {"CANCELLED"})
+        return {"RUNNING_MODAL"}
 
 
 # ==============================================================================
@@ -3,7 +3,10 @@
 
 """Random Helper Functions & Classe for Blender Python Scripting."""
 
-# import re
+import logging
+import logging.handlers
+import re
+import sys
 
 try:
     import bpy
@@ -111,12 +114,13 @@ class colors:
         return result
 
 
+# matches all color and control sequences of `colors`
+ASCII_CONTROLLS_RE = re.compile("\033\\[[0-9;]*m")
+
+
 def filter_ASCII_controlls(data):
     """Remove ASCII controll characters."""
-    code_list = colors.get_flat_list()
-    for el in code_list:
-        data = data.replace(el, "")
-    return data
+    return ASCII_CONTROLLS_RE.sub("", data)
 
 
 def test_filtering():
@@ -135,8 +139,8 @@ def test_filtering():
     print("test_filtered", test_filtered)
 
 
-def print_colored(mode, data, pre_line=""):
-    """Print with coloring similar to blenders info area."""
+def get_mode_color(mode):
+    """Get color for report mode (similar to blenders info area)."""
     printcolor = colors.reset
     if mode == {'INFO'}:
         printcolor = colors.fg.lightblue
@@ -144,33 +148,66 @@ def print_colored(mode, data, pre_line=""):
         printcolor = colors.fg.orange
     elif mode == {'ERROR'}:
         printcolor = colors.fg.red
+    return printcolor
+
+
+def print_colored(mode, data, pre_line=""):
+    """Print with coloring similar to blenders info area."""
+    printcolor = get_mode_color(mode)
     print("{}{}{}{}".format(str(pre_line), printcolor, data, colors.reset))
 
 
-# https://blender.stackexchange.com/a/142317/16634
-def print_blender_console(mode, data, pre_line=""):
-    """Print to blenders console area."""
-    if bpy:
-        message_type = mode.pop()
-        if message_type == 'WARNING':
-            message_type = 'INFO'
-        elif message_type == 'INFO':
-            message_type = 'OUTPUT'
-        else:
-            message_type = 'INFO'
-        data = filter_ASCII_controlls(str(data))
-        data = filter_ASCII_controlls(str(pre_line)) + data
+def get_console_message_type(mode):
+    """Get blender console scrollback type for report mode."""
+    message_type = 'INFO'
+    if 'INFO' in mode or 'DEBUG' in mode:
+        message_type = 'OUTPUT'
+    return message_type
+
+
+def get_console_areas():
+    """Get (window, screen, area) of all blender console areas."""
+    result = []
+    if bpy and bpy.context.window_manager:
         for window in bpy.context.window_manager.windows:
             screen = window.screen
             for area in screen.areas:
                 if area.type == 'CONSOLE':
-                    override = {
-                        'window': window,
-                        'screen': screen,
-                        'area': area
-                    }
-                    bpy.ops.console.scrollback_append(
-                        override, text=data, type=message_type)
+                    result.append((window, screen, area))
+    return result
+
+
+# https://blender.stackexchange.com/a/142317/16634
+def print_blender_console_lines(lines):
+    """
+    Print list of (message_type, text) lines to blenders console area.
+
+    the console areas are only searched once for all lines.
+    """
+    if not lines:
+        return
+    for window, screen, area in get_console_areas():
+        if hasattr(bpy.context, "temp_override"):
+            # blender >= 3.2 (dict overrides are removed in 4.0)
+            with bpy.context.temp_override(window=window, screen=screen, area=area):
+                for message_type, text in lines:
+                    bpy.ops.console.scrollback_append(text=text, type=message_type)
+        else:
+            override = {
+                'window': window,
+                'screen': screen,
+                'area': area
+            }
+            for message_type, text in lines:
+                bpy.ops.console.scrollback_append(
+                    override, text=text, type=message_type)
+
+
+def print_blender_console(mode, data, pre_line=""):
+    """Print to blenders console area."""
+    if bpy:
+        data = filter_ASCII_controlls(str(pre_line) + str(data))
+        print_blender_console_lines([(get_console_message_type(mode), data)])
 
 
 def print_console(mode, data, pre_line=""):
@@ -194,6 +231,156 @@ def print_multi(*, mode, data, pre_line="", report=None):
         print_blender_console(mode, data, pre_line)
 
 
+# ****************************************
+# logging
+
+# verbosity name → logging level
+VERBOSITY_LEVELS = {
+    'ERROR': logging.ERROR,
+    'WARNING': logging.WARNING,
+    'INFO': logging.INFO,
+    'DEBUG': logging.DEBUG,
+}
+
+
+def get_mode_level(mode):
+    """Get logging level for report mode ({'INFO'}, {'WARNING'}, ...)."""
+    return max(
+        (VERBOSITY_LEVELS.get(name, logging.INFO) for name in mode),
+        default=logging.INFO,
+    )
+
+
+def get_level_mode(level):
+    """Get report mode for logging level."""
+    if level >= logging.ERROR:
+        return {'ERROR'}
+    if level >= logging.WARNING:
+        return {'WARNING'}
+    if level >= logging.INFO:
+        return {'INFO'}
+    return {'DEBUG'}
+
+
+class LazyStr(object):
+    """
+    Call `func(*args, **kwargs)` only if the string is needed.
+
+    use for expensive log message arguments:
+    `log.debug("{}obj: {}", pre_line, LazyStr(format_obj, obj))`
+    """
+
+    def __init__(self, func, *args, **kwargs):
+        """Init."""
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        """Call func."""
+        return str(self.func(*self.args, **self.kwargs))
+
+
+class BraceMessage(object):
+    """Log message formated with `str.format` - only when it is emitted."""
+
+    def __init__(self, fmt, args):
+        """Init."""
+        self.fmt = fmt
+        self.args = args
+
+    def __str__(self):
+        """Format message."""
+        if self.args:
+            return self.fmt.format(*self.args)
+        return str(self.fmt)
+
+
+class BraceStyleAdapter(logging.LoggerAdapter):
+    """
+    Logger with `str.format` style arguments.
+
+    `log.debug("{}mesh_label: '{}'", pre_line, mesh_label)`
+    messages below the logger level cost only the level check.
+    """
+
+    def __init__(self, logger):
+        """Init."""
+        super(BraceStyleAdapter, self).__init__(logger, {})
+
+    def log(self, level, msg, *args, **kwargs):
+        """Log message (if level is enabled)."""
+        if self.isEnabledFor(level):
+            self.logger._log(level, BraceMessage(msg, args), (), **kwargs)
+
+
+def get_logger(name, propagate=False):
+    """
+    Get brace style logger.
+
+    loggers of sub modules use `propagate=True`
+    to reach the handler of their package logger.
+    """
+    logger = logging.getLogger(name)
+    # the ConsoleLogHandler is added during imports.
+    logger.propagate = propagate
+    return BraceStyleAdapter(logger)
+
+
+class ConsoleLogHandler(logging.handlers.BufferingHandler):
+    """
+    Batched output to the system console and blenders console area.
+
+    records are collected and written in one go -
+    every `capacity` records, on errors and on `flush` / `close`.
+    """
+
+    def __init__(self, capacity=500, use_blender_console=True):
+        """Init."""
+        super(ConsoleLogHandler, self).__init__(capacity)
+        self.use_blender_console = use_blender_console
+
+    def shouldFlush(self, record):
+        """Flush if buffer is full or on errors."""
+        return len(self.buffer) >= self.capacity or record.levelno >= logging.ERROR
+
+    def flush(self):
+        """Write buffered records."""
+        self.acquire()
+        try:
+            if not self.buffer:
+                return
+            records = self.buffer
+            self.buffer = []
+        finally:
+            self.release()
+        system_lines = []
+        console_lines = []
+        for record in records:
+            mode = get_level_mode(record.levelno)
+            try:
+                message = record.getMessage()
+            except Exception:
+                self.handleError(record)
+                continue
+            system_lines.append(
+                "{}{}{}".format(get_mode_color(mode), message, colors.reset)
+            )
+            if self.use_blender_console:
+                message_type = get_console_message_type(mode)
+                for line in filter_ASCII_controlls(message).split("\n"):
+                    console_lines.append((message_type, line))
+        if system_lines:
+            sys.stdout.write("\n".join(system_lines) + "\n")
+            sys.stdout.flush()
+        if self.use_blender_console and bpy:
+            try:
+                print_blender_console_lines(console_lines)
+            except (RuntimeError, AttributeError):
+                # no console areas available (background mode / restricted context)
+                pass
+
+
 # def print_blender_info(mode, data):
 #     message_type = mode.pop()
 #     if message_type is 'WARNING':
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Command line batch converter FCStd → .blend.
+
+run with blender in background mode:
+    blender -b -P cli.py -- [options] INPUT [INPUT ...]
+
+INPUT can be a .FCStd file, a directory (all .FCStd files in it)
+or a glob pattern ("models/**/*.FCStd").
+every input is imported into an empty scene and saved as
+<output dir>/<name>.blend (`--mode blend`)
+or only the imported collection is written as library to link from (`--mode library`).
+inputs whose output is newer are skipped (use `--force` to convert them anyway).
+with `--jobs N` N files are converted in parallel blender processes.
+
+    blender -b -P cli.py -- --jobs 4 --output-dir out/ --freecad-path /usr/lib/freecad/lib models/
+"""
+
+import argparse
+import glob
+import importlib
+import math
+import os
+import subprocess
+import sys
+import time
+
+import bpy
+
+
+ADDON_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# command line option → ImportFcstd argument
+# (flag, ImportFcstd keyword, type, default, help)
+# bool options get a --no-<flag> variant.
+IMPORT_OPTIONS = (
+    ("--update", "update", bool, False, "update existing objects (in the output file)"),
+    (
+        "--update-only-modified-meshes",
+        "update_only_modified_meshes",
+        bool,
+        True,
+        "only replace the geometry if the source in FreeCAD has changed",
+    ),
+    ("--placement", "placement", bool, True, "set blender pivot points to FreeCAD placements"),
+    ("--scale", "scale", float, 0.001, "scale factor (default: mm → m)"),
+    ("--tessellation", "tessellation", float, 0.10, "tessellation value"),
+    (
+        "--tessellation-adaptive",
+        "tessellation_adaptive",
+        bool,
+        False,
+        "derive the tessellation of every object from its size",
+    ),
+    (
+        "--tessellation-relative",
+        "tessellation_relative",
+        float,
+        0.01,
+        "adaptive: deflection as fraction of the object size",
+    ),
+    ("--tessellation-min", "tessellation_min", float, 0.01, "adaptive: smallest deflection"),
+    ("--tessellation-max", "tessellation_max", float, 5.0, "adaptive: biggest deflection"),
+    ("--weld-tolerance", "weld_tolerance", float, 0.00001, "merge vertices closer than this"),
+    ("--triangulate-meshes", "triangulate_meshes", bool, False, "triangulate all faces"),
+    ("--use-workers", "use_workers", bool, False, "tessellate in FreeCAD worker processes"),
+    ("--worker-count", "worker_count", int, 0, "worker processes (0 = one per CPU core)"),
+    ("--cache-dir", "cache_dir", str, None, "tessellation cache directory"),
+    ("--cache-max-size", "cache_max_size", int, 1024, "tessellation cache size in MB"),
+    (
+        "--cleanup-after-import",
+        "cleanup_after_import",
+        bool,
+        False,
+        "apply Tris to Quads and Limited Dissolve",
+    ),
+    ("--auto-smooth", "auto_smooth_use", bool, True, "activate auto smooth"),
+    ("--auto-smooth-angle", "auto_smooth_angle", float, 30.0, "auto smooth angle in degrees"),
+    ("--skiphidden", "skiphidden", bool, True, "only import objects visible in FreeCAD"),
+    ("--filter-sketch", "filter_sketch", bool, True, "filter Sketch objects out"),
+    ("--sharemats", "sharemats", bool, True, "share materials with the same color"),
+    (
+        "--recompute",
+        "recompute",
+        str,
+        "TOUCHED",
+        "recompute policy: NEVER, TOUCHED or FULL",
+    ),
+    ("--profile", "profile", bool, False, "write the import profile JSON"),
+    ("--trace", "trace", bool, False, "write the Chrome trace JSON"),
+    ("--verbosity", "verbosity", str, "WARNING", "ERROR, WARNING, INFO or DEBUG"),
+    ("--obj-name-prefix", "obj_name_prefix", str, "", "prefix for all object names"),
+    (
+        "--obj-name-prefix-with-filename",
+        "obj_name_prefix_with_filename",
+        bool,
+        False,
+        "prefix object names with the file name",
+    ),
+    (
+        "--links-as-collectioninstance",
+        "links_as_collectioninstance",
+        bool,
+        False,
+        "create App::Link objects as collection instances",
+    ),
+    ("--freecad-path", "path_to_freecad", str, None, "path to the FreeCAD lib"),
+    (
+        "--system-packages",
+        "path_to_system_packages",
+        str,
+        None,
+        "path to the system python modules",
+    ),
+)
+
+MODE_BLEND = "blend"
+MODE_LIBRARY = "library"
+
+
+def import_addon():
+    """Import this addon package (the script runs outside of it)."""
+    if __package__:
+        return sys.modules[__package__]
+    parent_dir = os.path.dirname(ADDON_DIR)
+    if parent_dir not in sys.path:
+        sys.path.insert(0, parent_dir)
+    return importlib.import_module(os.path.basename(ADDON_DIR))
+
+
+def create_parser():
+    """Create argument parser."""
+    parser = argparse.ArgumentParser(
+        prog="blender -b -P cli.py --",
+        description="Convert FreeCAD .FCStd files to .blend files.",
+    )
+    parser.add_argument(
+        "inputs", nargs="+", help=".FCStd files, directories or glob patterns"
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        default=None,
+        help="directory for the output files (default: next to the input)",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=(MODE_BLEND, MODE_LIBRARY),
+        default=MODE_BLEND,
+        help="write the whole scene (blend) or only the imported collection (library)",
+    )
+    parser.add_argument(
+        "-r", "--recursive", action="store_true", help="search directories recursively"
+    )
+    parser.add_argument(
+        "-f", "--force", action="store_true", help="convert even if the output is newer"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of parallel blender processes",
+    )
+    for flag, dest, option_type, default, help_text in IMPORT_OPTIONS:
+        if option_type is bool:
+            parser.add_argument(
+                flag,
+                dest=dest,
+                action=argparse.BooleanOptionalAction,
+                default=default,
+                help=help_text,
+            )
+        else:
+            parser.add_argument(
+                flag,
+                dest=dest,
+                type=option_type,
+                default=default,
+                help="{} (default: {})".format(help_text, default),
+            )
+    return parser
+
+
+def get_import_kwargs(args):
+    """Get ImportFcstd keyword arguments."""
+    kwargs = {dest: getattr(args, dest) for _, dest, _, _, _ in IMPORT_OPTIONS}
+    kwargs["auto_smooth_angle"] = math.radians(kwargs["auto_smooth_angle"])
+    return kwargs
+
+
+def get_child_args(args):
+    """Get command line options for a child process (without inputs and jobs)."""
+    result = ["--mode", args.mode, "--jobs", "1"]
+    if args.output_dir:
+        result += ["--output-dir", args.output_dir]
+    if args.force:
+        result.append("--force")
+    for flag, dest, option_type, _, _ in IMPORT_OPTIONS:
+        value = getattr(args, dest)
+        if option_type is bool:
+            result.append(flag if value else "--no-" + flag[2:])
+        elif value is not None:
+            result += [flag, str(value)]
+    return result
+
+
+def find_input_files(inputs, recursive=False):
+    """Expand directories and glob patterns to a sorted list of .FCStd files."""
+    result = []
+    for item in inputs:
+        if os.path.isdir(item):
+            pattern = "**/*" if recursive else "*"
+            paths = glob.glob(os.path.join(item, pattern), recursive=recursive)
+        elif os.path.isfile(item):
+            paths = [item]
+        else:
+            paths = glob.glob(item, recursive=True)
+        for path in paths:
+            if path.lower().endswith(".fcstd") and os.path.isfile(path):
+                path = os.path.abspath(path)
+                if path not in result:
+                    result.append(path)
+    return sorted(result)
+
+
+def get_output_path(input_path, output_dir=None):
+    """Get .blend path for input."""
+    name = os.path.splitext(os.path.basename(input_path))[0] + ".blend"
+    if output_dir:
+        return os.path.join(os.path.abspath(output_dir), name)
+    return os.path.join(os.path.dirname(input_path), name)
+
+
+def is_up_to_date(input_path, output_path):
+    """Check if output is newer than input."""
+    return os.path.exists(output_path) and (
+        os.path.getmtime(output_path) >= os.path.getmtime(input_path)
+    )
+
+
+def get_default_freecad_paths(addon):
+    """Get FreeCAD paths from the addon preferences (or their defaults)."""
+    prefs_class = addon.IMPORT_OT_FreeCAD_Preferences
+    path_to_freecad = prefs_class._default_freecad
+    path_to_system_packages = prefs_class._default_system_packages
+    addon_prefs = bpy.context.preferences.addons.get(prefs_class.bl_idname, None)
+    if addon_prefs:
+        path_to_freecad = addon_prefs.preferences.filepath_freecad
+        path_to_system_packages = addon_prefs.preferences.filepath_system_packages
+    return path_to_freecad, path_to_system_packages
+
+
+def resolve_freecad_paths(addon, args):
+    """Fill missing FreeCAD paths from the addon preferences."""
+    # the child processes run with factory settings - so they get the paths as options.
+    path_to_freecad, path_to_system_packages = get_default_freecad_paths(addon)
+    if not args.path_to_freecad:
+        args.path_to_freecad = path_to_freecad
+    if not args.path_to_system_packages:
+        args.path_to_system_packages = path_to_system_packages
+
+
+def reset_scene():
+    """Start with an empty scene."""
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+
+
+def save_output(importer, output_path, mode):
+    """Save the import result."""
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    if mode == MODE_LIBRARY:
+        datablocks = {
+            collection
+            for collection in (importer.fcstd_collection, importer.link_targets)
+            if collection
+        }
+        bpy.data.libraries.write(output_path, datablocks, fake_user=True)
+    else:
+        bpy.ops.wm.save_as_mainfile(filepath=output_path, check_existing=False)
+
+
+def convert_file(addon, args, input_path, output_path):
+    """Import one file into an empty scene and save it."""
+    reset_scene()
+    importer = addon.import_fcstd.ImportFcstd(**get_import_kwargs(args))
+    result = importer.import_fcstd(filename=input_path)
+    if result != {"FINISHED"}:
+        return False
+    save_output(importer, output_path, args.mode)
+    return True
+
+
+def run_in_process(addon, args, jobs):
+    """Convert files one after the other in this blender process."""
+    results = []
+    for input_path, output_path in jobs:
+        start = time.perf_counter()
+        try:
+            success = convert_file(addon, args, input_path, output_path)
+        except Exception as e:
+            print("'{}' failed: {}".format(input_path, e), file=sys.stderr)
+            success = False
+        results.append((input_path, success, time.perf_counter() - start))
+    return results
+
+
+def run_parallel(args, jobs):
+    """Convert files in parallel blender processes (one process per file)."""
+    child_args = get_child_args(args)
+    pending = list(jobs)
+    running = []
+    results = []
+    while pending or running:
+        while pending and len(running) < args.jobs:
+            input_path, _output_path = pending.pop(0)
+            command = [
+                bpy.app.binary_path,
+                "--background",
+                "--factory-startup",
+                "--python",
+                os.path.abspath(__file__),
+                "--",
+            ] + child_args + [input_path]
+            running.append((subprocess.Popen(command), input_path, time.perf_counter()))
+        time.sleep(0.1)
+        for entry in list(running):
+            process, input_path, start = entry
+            if process.poll() is not None:
+                running.remove(entry)
+                results.append(
+                    (input_path, process.returncode == 0, time.perf_counter() - start)
+                )
+    return results
+
+
+def print_summary(results, skipped):
+    """Print result per file."""
+    print("-" * 42)
+    for input_path in skipped:
+        print("  {:>8}  {:<7} {}".format("", "skipped", input_path))
+    for input_path, success, duration in results:
+        print(
+            "  {:>7.2f}s  {:<7} {}".format(
+                duration, "ok" if success else "FAILED", input_path
+            )
+        )
+    failed = sum(1 for _, success, _ in results if not success)
+    print(
+        "converted {} files, {} skipped, {} failed.".format(
+            len(results) - failed, len(skipped), failed
+        )
+    )
+    print("-" * 42)
+
+
+def main(argv=None):
+    """Main."""
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    args = create_parser().parse_args(argv)
+    if args.recompute not in ("NEVER", "TOUCHED", "FULL"):
+        print("unknown recompute policy '{}'".format(args.recompute), file=sys.stderr)
+        return 2
+
+    jobs = []
+    skipped = []
+    for input_path in find_input_files(args.inputs, args.recursive):
+        output_path = get_output_path(input_path, args.output_dir)
+        if not args.force and is_up_to_date(input_path, output_path):
+            skipped.append(input_path)
+        else:
+            jobs.append((input_path, output_path))
+
+    addon = import_addon()
+    resolve_freecad_paths(addon, args)
+    if args.jobs > 1 and len(jobs) > 1:
+        results = run_parallel(args, jobs)
+    else:
+        results = run_in_process(addon, args, jobs)
+    print_summary(results, skipped)
+    if any(not success for _, success, _ in results):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit_code = main()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    # skip the interpreter teardown:
+    # unloading the OpenCASCADE libraries can crash on exit.
+    os._exit(exit_code)
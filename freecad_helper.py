@@ -7,32 +7,32 @@
 # import blender_helper as b_helper
 
 
-def print_obj_header(
+def format_obj_header(
     pre_line="", show_lists=False, show_list_details=False,
 ):
-    """Print header for objects list."""
-    print(
-        pre_line + "{:<25} {:<15} {:<25}" "".format("Label", "Name", "TypeId"), end="",
-    )
+    """Format header for objects list."""
+    result = pre_line + "{:<25} {:<15} {:<25}" "".format("Label", "Name", "TypeId")
     if show_lists:
-        print(
-            "{:>2} {:>2} {:>2} {:>2} {:>2}" "".format("P", "I", "O", "G", "H",), end=""
-        )
+        result += "{:>2} {:>2} {:>2} {:>2} {:>2}" "".format("P", "I", "O", "G", "H",)
         if show_list_details:
-            print(
-                ("    {:<30}" * 5).format(
-                    "[Parents]", "[InList]", "[OutList]", "[Group]", "[Hosts]",
-                ),
-                #     b_helper.colors.fg.lightblue + "[Parents]",
-                #     b_helper.colors.fg.lightred + "[InList]",
-                #     b_helper.colors.fg.yellow + "[OutList]",
-                #     b_helper.colors.fg.pink + "[Group]",
-                #     b_helper.colors.fg.lightgreen + "[Hosts]",
-                # )
-                # + b_helper.colors.reset,
-                end="",
+            result += ("    {:<30}" * 5).format(
+                "[Parents]", "[InList]", "[OutList]", "[Group]", "[Hosts]",
             )
-    print()
+            #     b_helper.colors.fg.lightblue + "[Parents]",
+            #     b_helper.colors.fg.lightred + "[InList]",
+            #     b_helper.colors.fg.yellow + "[OutList]",
+            #     b_helper.colors.fg.pink + "[Group]",
+            #     b_helper.colors.fg.lightgreen + "[Hosts]",
+            # )
+            # + b_helper.colors.reset,
+    return result
+
+
+def print_obj_header(
+    pre_line="", show_lists=False, show_list_details=False,
+):
+    """Print header for objects list."""
+    print(format_obj_header(pre_line, show_lists, show_list_details))
 
 
 def format_obj_show_lists(obj, show_list_details):
@@ -102,33 +102,56 @@ def print_obj(
     )
 
 
-def print_objects(
+def format_objects(
     objects,
     pre_line="",
     pre_list_entry="* ",
     show_lists=False,
     show_list_details=False,
 ):
-    """Print objects list."""
+    """Format objects list (one line per object)."""
     pre_list_entry_space = " " * len(pre_list_entry)
-    print_obj_header(
-        pre_line=pre_line + pre_list_entry_space,
-        show_lists=show_lists,
-        show_list_details=show_list_details,
-    )
+    lines = [
+        format_obj_header(
+            pre_line=pre_line + pre_list_entry_space,
+            show_lists=show_lists,
+            show_list_details=show_list_details,
+        )
+    ]
     for index, obj in enumerate(objects):
         # line_color = b_helper.colors.reset
         # if index % 2:
         #     # line_color = b_helper.colors.bg.lightgrey + b_helper.colors.fg.black
         #     line_color = b_helper.colors.bg.black
-        print_obj(
-            obj,
-            pre_line=pre_line + pre_list_entry,
-            # pre_line=pre_line + pre_list_entry + line_color,
+        lines.append(
+            format_obj(
+                obj,
+                pre_line=pre_line + pre_list_entry,
+                # pre_line=pre_line + pre_list_entry + line_color,
+                show_lists=show_lists,
+                show_list_details=show_list_details,
+            )
+        )
+    return "\n".join(lines)
+
+
+def print_objects(
+    objects,
+    pre_line="",
+    pre_list_entry="* ",
+    show_lists=False,
+    show_list_details=False,
+):
+    """Print objects list."""
+    print(
+        format_objects(
+            objects,
+            pre_line=pre_line,
+            pre_list_entry=pre_list_entry,
             show_lists=show_lists,
             show_list_details=show_list_details,
-            # end=b_helper.colors.reset + "\n",
         )
+    )
 
 
 # ****************************************
@@ -170,8 +193,10 @@ def get_filtered_objects(doc, typeid_filter_list=None):
     return result_objects
 
 
-def get_root_objects(doc, filter_list=[]):
+def get_root_objects(doc, filter_list=[], graph=None):
     """Get root list of objects."""
+    if graph is None:
+        graph = ObjectGraph(doc)
     typeid_filter_list = [
         "App::Line",
         "App::Plane",
@@ -180,11 +205,11 @@ def get_root_objects(doc, filter_list=[]):
     typeid_filter_list = typeid_filter_list + filter_list
     result_objects = []
     result_objects_withHost = []
-    for obj in doc.Objects:
+    for obj in graph.objects:
         if obj.TypeId not in typeid_filter_list:
             # if len(obj.Parents) == 0 and len(object_get_HostChilds(obj) == 0):
             #     result_objects.append(obj)
-            if len(obj.Parents) == 0:
+            if len(graph.get_parents(obj)) == 0:
                 if hasattr(obj, "Hosts"):
                     if len(obj.Hosts) == 0:
                         result_objects.append(obj)
@@ -195,8 +220,10 @@ def get_root_objects(doc, filter_list=[]):
     return result_objects, result_objects_withHost
 
 
-def object_get_HostChilds(obj):
+def object_get_HostChilds(obj, graph=None):
     """Return List of Objects that have set Host(s) to this object."""
+    if graph is not None and graph.contains(obj):
+        return graph.get_host_children(obj)
     # source:
     # FreeCAD/src/Mod/Arch/ArchComponent.py
     # https://github.com/FreeCAD/FreeCAD/blob/master/src/Mod/Arch/ArchComponent.py#L1109
@@ -215,6 +242,206 @@ def object_get_HostChilds(obj):
     return hosts
 
 
+def get_object_key(obj):
+    """Get key that is unique across documents (external links)."""
+    return (obj.Document.Name, obj.Name)
+
+
+class ObjectGraph(object):
+    """
+    Index of the object relations of a document - built in one pass.
+
+    FreeCAD computes `Parents`, `InListRecursive`, ... on every access.
+    on big Arch models (thousands of walls, windows, openings)
+    querying them per object gets quadratic.
+
+    - parents: `obj.Parents` (read once per object)
+    - host children: objects that have set Host(s) to this object
+    - group children: `obj.Group`
+    - link targets: `obj.LinkedObject` (without sub element)
+
+    objects of other documents (external links) are not indexed -
+    use `contains` to check.
+    """
+
+    def __init__(self, doc=None):
+        """Init."""
+        self.objects = []
+        self.parents = {}
+        self.host_children = {}
+        self.group_children = {}
+        self.link_targets = {}
+        if doc is not None:
+            self.add_document(doc)
+
+    def add_document(self, doc):
+        """Index all objects of doc."""
+        objects = doc.Objects
+        self.objects.extend(objects)
+        for obj in objects:
+            key = get_object_key(obj)
+            self.parents[key] = obj.Parents
+            self.host_children.setdefault(key, [])
+            if hasattr(obj, "Group"):
+                self.group_children[key] = obj.Group
+            if hasattr(obj, "LinkedObject"):
+                linked_obj = obj.LinkedObject
+                if isinstance(linked_obj, tuple):
+                    linked_obj = linked_obj[0]
+                self.link_targets[key] = linked_obj
+        # same rules as `object_get_HostChilds`
+        for obj in objects:
+            hosts = []
+            if hasattr(obj, "Host"):
+                if obj.Host:
+                    hosts = [obj.Host]
+            elif hasattr(obj, "Hosts"):
+                if obj.Hosts:
+                    hosts = obj.Hosts
+            for host in hosts:
+                host_key = get_object_key(host)
+                if host_key in self.host_children:
+                    self.host_children[host_key].append(obj)
+
+    def contains(self, obj):
+        """Check if obj is indexed."""
+        return get_object_key(obj) in self.parents
+
+    def get_parents(self, obj):
+        """Get `obj.Parents`."""
+        key = get_object_key(obj)
+        if key not in self.parents:
+            return obj.Parents
+        return self.parents[key]
+
+    def get_host_children(self, obj):
+        """Get objects that have set Host(s) to obj."""
+        return self.host_children.get(get_object_key(obj), [])
+
+    def has_host_children(self, obj):
+        """Check if any object has set Host(s) to obj."""
+        return len(self.get_host_children(obj)) > 0
+
+    def get_group_children(self, obj):
+        """Get `obj.Group`."""
+        key = get_object_key(obj)
+        if key not in self.group_children:
+            return obj.Group
+        return self.group_children[key]
+
+    def get_link_target(self, obj):
+        """Get `obj.LinkedObject` (without sub element)."""
+        key = get_object_key(obj)
+        if key not in self.link_targets:
+            linked_obj = obj.LinkedObject
+            if isinstance(linked_obj, tuple):
+                linked_obj = linked_obj[0]
+            return linked_obj
+        return self.link_targets[key]
+
+
+def get_sub_objects(obj, graph):
+    """
+    Get the sub objects the importer walks into - as (obj, visibility) pairs.
+
+    visibility is the `VisibilityList` entry (True for link targets) -
+    None means the visibility of the sub object itself decides.
+    only the visible (`obj.Visibility`) group and host children are returned.
+    arrays are expanded during the import so their elements are not known yet.
+    """
+    if obj.isDerivedFrom("Part::FeaturePython"):
+        if hasattr(obj, "ExpandArray") and hasattr(obj, "ElementList"):
+            return list(zip(obj.ElementList, obj.VisibilityList))
+        if hasattr(obj, "ArrayType"):
+            return []
+        sub_objects = object_get_HostChilds(obj, graph)
+    elif obj.isDerivedFrom("App::Part"):
+        sub_objects = graph.get_group_children(obj)
+    elif obj.isDerivedFrom("App::Link") or obj.isDerivedFrom("App::LinkElement"):
+        linked_obj = graph.get_link_target(obj)
+        if not linked_obj:
+            return []
+        if hasattr(obj, "ElementList") and len(obj.ElementList) > 0:
+            return list(zip(obj.ElementList, obj.VisibilityList))
+        if linked_obj.getLinkedObject().isDerivedFrom("Part::Feature"):
+            linked_obj = linked_obj.getLinkedObject()
+        return [(linked_obj, True)]
+    else:
+        return []
+    sub_objects = filtered_objects(sub_objects, include_only_visible=True)
+    return [(sub_obj, None) for sub_obj in sub_objects]
+
+
+def get_reachable_objects(root_objects, graph, is_visible):
+    """
+    Get the objects reachable from root_objects (depth first - every object once).
+
+    `is_visible(obj, visibility)` decides if obj and its sub objects are used.
+    """
+    result = []
+    found = set()
+    stack = [obj for obj in reversed(root_objects) if is_visible(obj, None)]
+    while stack:
+        obj = stack.pop()
+        obj_key = get_object_key(obj)
+        if obj_key in found:
+            continue
+        found.add(obj_key)
+        result.append(obj)
+        for sub_obj, sub_visibility in reversed(get_sub_objects(obj, graph)):
+            if is_visible(sub_obj, sub_visibility):
+                stack.append(sub_obj)
+    return result
+
+
+# ******************************************
+# recompute
+
+RECOMPUTE_NEVER = "NEVER"
+RECOMPUTE_TOUCHED = "TOUCHED"
+RECOMPUTE_FULL = "FULL"
+
+
+def object_needs_recompute(obj):
+    """Check if object is touched or invalid."""
+    if not obj.isValid():
+        return True
+    state = obj.State
+    return "Touched" in state or "Invalid" in state
+
+
+def recompute_objects(doc, objects):
+    """
+    Recompute only the given objects and their dependencies.
+
+    returns the number of recomputed objects.
+    """
+    if not objects:
+        return 0
+    try:
+        return doc.recompute(objects)
+    except TypeError:
+        # old FreeCAD versions can only recompute the whole document
+        return doc.recompute()
+
+
+def recompute_document(doc, policy=RECOMPUTE_TOUCHED):
+    """
+    Recompute document according to policy.
+
+    NEVER: use the shapes as saved in the file.
+    TOUCHED: only recompute touched or invalid objects (and their dependencies).
+    FULL: recompute the whole document.
+    returns the number of recomputed objects.
+    """
+    if policy == RECOMPUTE_NEVER:
+        return 0
+    if policy == RECOMPUTE_TOUCHED:
+        objects = [obj for obj in doc.Objects if object_needs_recompute(obj)]
+        return recompute_objects(doc, objects)
+    return doc.recompute()
+
+
 # ******************************************
 # `is_toplevel_in_list` and `get_toplevel_objects`
 # from forum post 'Get highest objects of model' by kbwbe
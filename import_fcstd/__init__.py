@@ -7,6 +7,9 @@ import sys
 import bpy
 import os
 import math
+import time
+
+import numpy as np
 
 # import pprint
 
@@ -15,12 +18,57 @@ from .. import blender_helper as b_helper
 
 from . import helper
 from . import guidata
+from . import fcstd_archive
+from . import tessellate
+from . import tesscache
+from . import workerpool
+from . import material
+from . import profiler
+from . import importqueue
+from . import dataindex
 from .material import MaterialManager
+from .meshdata import MeshData
+
+
+log = b_helper.get_logger(__name__)
 
 
 # set to True to triangulate all faces (will loose multimaterial info)
 TRIANGULATE = False
 
+# import options that change the import result.
+# if the FCStd archive and these are unchanged an update can be skipped.
+ARCHIVE_CONFIG_KEYS = (
+    "recompute",
+    "placement",
+    "scale",
+    "tessellation",
+    "tessellation_adaptive",
+    "tessellation_relative",
+    "tessellation_min",
+    "tessellation_max",
+    "weld_tolerance",
+    "triangulate_meshes",
+    "skiphidden",
+    "filter_sketch",
+    "sharemats",
+    "obj_name_prefix",
+    "obj_name_prefix_with_filename",
+    "links_as_collectioninstance",
+    "auto_smooth_use",
+    "auto_smooth_angle",
+    "cleanup_after_import",
+)
+
+# tree prefixes for the root objects
+# │─ ┌─ └─ ├─ ╞═ ╘═╒═
+# ║═ ╔═ ╚═ ╠═ ╟─
+# ┃━ ┏━ ┗━ ┣━ ┠─
+ROOT_PRE_LINE_START = "┏━━━━ "
+ROOT_PRE_LINE_SUB = "┣━ "
+ROOT_PRE_LINE_FOLLOW = "┃    "
+ROOT_PRE_LINE_END = "┗━━━━ "
+
 
 class ImportFcstd(object):
     """Import fcstd files."""
@@ -34,7 +82,17 @@ class ImportFcstd(object):
         placement=True,
         scale=0.001,
         tessellation=0.10,
+        tessellation_adaptive=False,
+        tessellation_relative=0.01,
+        tessellation_min=0.01,
+        tessellation_max=5.0,
+        weld_tolerance=0.00001,
         triangulate_meshes=False,
+        use_workers=False,
+        worker_count=0,
+        concurrent_files=False,
+        cache_dir=None,
+        cache_max_size=1024,
         cleanup_after_import=False,
         auto_smooth_use=True,
         auto_smooth_angle=math.radians(30),
@@ -42,6 +100,10 @@ class ImportFcstd(object):
         filter_sketch=True,
         sharemats=True,
         update_materials=False,
+        recompute=fc_helper.RECOMPUTE_TOUCHED,
+        profile=False,
+        trace=False,
+        verbosity="INFO",
         obj_name_prefix="",
         obj_name_prefix_with_filename=False,
         links_as_collectioninstance=True,
@@ -57,7 +119,21 @@ class ImportFcstd(object):
             "update_only_modified_meshes": update_only_modified_meshes,
             "placement": placement,
             "tessellation": tessellation,
+            # adaptive: the deflection is a fraction of the object size
+            # (bounding box diagonal) - clamped to min / max.
+            "tessellation_adaptive": tessellation_adaptive,
+            "tessellation_relative": tessellation_relative,
+            "tessellation_min": tessellation_min,
+            "tessellation_max": tessellation_max,
+            "weld_tolerance": weld_tolerance,
             "triangulate_meshes": triangulate_meshes,
+            "use_workers": use_workers,
+            "worker_count": worker_count,
+            # batch import: tessellate the next files in worker processes
+            "concurrent_files": concurrent_files,
+            "cache_dir": cache_dir,
+            # in MB
+            "cache_max_size": cache_max_size,
             "cleanup_after_import": cleanup_after_import,
             "auto_smooth_use": auto_smooth_use,
             "auto_smooth_angle": auto_smooth_angle,
@@ -66,6 +142,11 @@ class ImportFcstd(object):
             "scale": scale,
             "sharemats": sharemats,
             "update_materials": update_materials,
+            "recompute": recompute,
+            "profile": profile,
+            "trace": trace,
+            # ERROR, WARNING, INFO or DEBUG (the object tree)
+            "verbosity": verbosity,
             "obj_name_prefix_with_filename": obj_name_prefix_with_filename,
             "obj_name_prefix": obj_name_prefix,
             "links_as_collectioninstance": links_as_collectioninstance,
@@ -75,7 +156,6 @@ class ImportFcstd(object):
         self.path_to_system_packages = path_to_system_packages
         self.report = report
 
-        print("config", self.config)
         self.doc = None
         self.doc_filename = None
         self.guidata = {}
@@ -84,7 +164,47 @@ class ImportFcstd(object):
         self.link_targets = None
         self.fcstd_empty = None
 
-        self.imported_obj_names = []
+        # names of the created / updated objects and meshes
+        self.imported_obj_names = set()
+        # name → object, mesh, collection (see `dataindex`)
+        # kept for all files of a batch import.
+        self.data_index = None
+        # root objects (see `import_step`)
+        self.root_objects = []
+        self.root_objects_withHost = []
+        self.root_index = 0
+        # parents, host children, ... of the document objects
+        self.object_graph = None
+        # object tree walk: import tasks of the current root object
+        self.import_queue = importqueue.ImportQueue()
+        self.log_handler = None
+        self.counts_before = {}
+        # batch import:
+        # FreeCAD and the additional modules are only loaded once.
+        self.freecad_loaded = False
+        # file name → running WorkerJobs (see `start_file_workers`)
+        self.file_workers = {}
+        self.file_worker_queue = []
+        # (file name, seconds, result) of every imported file
+        self.file_timings = []
+        self.file_start_time = 0.0
+        # running worker processes of the current file (see `start_workers`)
+        self.worker_jobs = None
+        # object name → MeshData tessellated by the worker processes
+        # (objects of the main document only)
+        self.worker_mesh_data = workerpool.WorkerResults()
+        # persistent tessellation cache (optional)
+        self.tessellation_cache = None
+        # (document name, object name) → shape content + tessellation options key
+        # (the tessellation cache key)
+        self.shape_keys = {}
+        # result of the FCStd archive pre-scan
+        self.archive_scan = None
+        # rgba → material cache shared by all objects (and files) of this importer.
+        # seeded from bpy.data on first import
+        self.matdatabase = None
+        # phase and per object timings (no-op if disabled)
+        self.profiler = profiler.ImportProfiler(enabled=profile, trace=trace)
 
         self.typeid_filter_list = [
             "GeoFeature",
@@ -94,10 +214,13 @@ class ImportFcstd(object):
             self.typeid_filter_list.append("Sketcher::SketchObject")
 
     def print_report(self, mode, data, pre_line=""):
-        """Multi print handling."""
-        b_helper.print_multi(
-            mode=mode, data=data, pre_line=pre_line, report=self.report,
-        )
+        """Multi print handling (gated by the verbosity level)."""
+        level = b_helper.get_mode_level(mode)
+        if not log.isEnabledFor(level):
+            return
+        log.log(level, "{}{}", pre_line, data)
+        if self.report:
+            self.report(mode, b_helper.filter_ASCII_controlls(str(data)))
 
     def format_obj(self, obj, pre_line="", post_line=""):
         """Print object with nice formating."""
@@ -114,23 +237,10 @@ class ImportFcstd(object):
         return message
 
     def print_obj(self, obj, pre_line="", post_line="", end="\n"):
-        """Print object with nice formating."""
-        message = ""
-
-        message = self.format_obj(obj=obj)
-        message += post_line
-        # print(message, end=end)
-        self.config["report"]({"INFO"}, message, pre_line)
-
-    def print_debug_report(self):
-        """print out some minimal debug things.."""
-        print("print_debug_report")
-        import FreeCAD
-        print("FreeCAD version:", FreeCAD.Version())
-        objects = FreeCAD.ActiveDocument.Objects
-        print("doc.Objects", len(objects))
-        for o in objects:
-            print(o, o.Name)
+        """Print object with nice formating (debug level)."""
+        log.debug(
+            "{}{}{}", pre_line, b_helper.LazyStr(self.format_obj, obj=obj), post_line
+        )
 
     def handle_label_prefix(self, label):
         """Handle all label prefix processing."""
@@ -239,8 +349,28 @@ class ImportFcstd(object):
 
     def fix_link_target_name(self, bobj):
         """Fix name of link target object."""
-        bobj.name = bobj.name + "__lt"
-        return bobj.name
+        return self.data_index.objects.rename(bobj, bobj.name + "__lt")
+
+    def has_host_children(self, obj):
+        """Check if any object has set Host(s) to obj (Arch)."""
+        if self.object_graph is not None and self.object_graph.contains(obj):
+            return self.object_graph.has_host_children(obj)
+        return len(fc_helper.object_get_HostChilds(obj)) > 0
+
+    def get_group_children(self, obj):
+        """Get `obj.Group` from the object graph."""
+        if self.object_graph is None:
+            return obj.Group
+        return self.object_graph.get_group_children(obj)
+
+    def get_link_target(self, obj):
+        """Get `obj.LinkedObject` from the object graph."""
+        if self.object_graph is None:
+            linked_obj = obj.LinkedObject
+            if isinstance(linked_obj, tuple):
+                linked_obj = linked_obj[0]
+            return linked_obj
+        return self.object_graph.get_link_target(obj)
 
     def check_obj_visibility(self, obj):
         """Check if obj is visible."""
@@ -262,27 +392,17 @@ class ImportFcstd(object):
         return result
 
     def check_collections_for_bobj(self, bobj):
-        """Search all collections for given bobj."""
-        found_in_collections = None
-        for col in bpy.data.collections:
-            if bobj.name in col.objects:
-                if found_in_collections is None:
-                    found_in_collections = []
-                found_in_collections.append(col.name)
+        """Get names of the collections bobj is linked to (or None)."""
+        found_in_collections = [
+            col.name for col in dataindex.get_users_collections(bobj)
+        ]
+        if not found_in_collections:
+            return None
         return found_in_collections
 
     # ##########################################
     # object handling
 
-    def hascurves(self, shape):
-        """Check if shape has curves."""
-        import Part
-
-        for e in shape.Edges:
-            if not isinstance(e.Curve, (Part.Line, Part.LineSegment)):
-                return True
-        return False
-
     def handle_placement(
         self,
         pre_line,
@@ -294,6 +414,10 @@ class ImportFcstd(object):
         negative=False,
     ):
         """Handle placement."""
+        with self.profiler.phase("placement"):
+            self._handle_placement(obj, bobj, enable_scale, relative, negative)
+
+    def _handle_placement(self, obj, bobj, enable_scale, relative, negative):
         if self.config["placement"]:
             # print(pre_line)
             # print(pre_line + "   §§§   §§§   handle_placement: '{}'".format(bobj.name))
@@ -339,6 +463,7 @@ class ImportFcstd(object):
         bobj.location.y = 0
         bobj.location.z = 0
 
+    @profiler.traced
     def update_tree_collections(self, func_data):
         """Update object tree."""
         pre_line = func_data["pre_line"]
@@ -370,11 +495,9 @@ class ImportFcstd(object):
             # link to import collection - so that the object is visible.
             collection = self.fcstd_collection
             collection.objects.link(bobj)
-            print(
-                pre_line + "'{}' add (tree_parents) to '{}' "
-                "".format(bobj, collection)
-            )
+            log.debug("{}'{}' add (tree_parents) to '{}' ", pre_line, bobj, collection)
 
+    @profiler.traced
     def update_tree_parents(self, func_data):
         """Update object tree."""
         pre_line = func_data["pre_line"]
@@ -385,9 +508,11 @@ class ImportFcstd(object):
         #     pre_line + "  func_data[parent_bobj] '{}'".format(func_data["parent_bobj"])
         # )
         if bobj.parent is None and func_data["parent_bobj"] is not None:
-            print(
-                pre_line + "update_tree_parents" + "  obj '{}' set parent to '{}' "
-                "".format(bobj, func_data["parent_bobj"])
+            log.debug(
+                "{}update_tree_parents  obj '{}' set parent to '{}' ",
+                pre_line,
+                bobj,
+                func_data["parent_bobj"],
             )
             # print(
             #     pre_line + "  obj '{}' set parent to '{}' "
@@ -396,25 +521,51 @@ class ImportFcstd(object):
             bobj.parent = func_data["parent_bobj"]
             # TODO: check 'update'
 
+    @profiler.traced
     def create_bmesh_from_func_data(
         self, func_data, obj_label, enable_import_scale=True
     ):
         """Create new object from bmesh."""
-        bmesh = bpy.data.meshes.new(name=obj_label)
-        bmesh.from_pydata(func_data["verts"], func_data["edges"], func_data["faces"])
-        bmesh.update()
+        mesh_data = func_data["mesh_data"]
+        bmesh = self.data_index.meshes.new(name=obj_label)
+        # fill the mesh in bulk from the flat buffers.
+        # np.asarray uses the buffer protocol -
+        # arrays and mapped worker buffers are not copied.
+        coords = np.asarray(mesh_data.coords)
         # handle import scalling
         if enable_import_scale:
-            scale = self.config["scale"]
-            for v in bmesh.vertices:
-                v.co *= scale
-        bmesh.update()
-        bmesh["freecad_mesh_hash"] = func_data["freecad_mesh_hash"]
+            coords = coords * self.config["scale"]
+        bmesh.vertices.add(mesh_data.vertex_count)
+        bmesh.vertices.foreach_set("co", coords.astype(np.float32, copy=False))
+        if mesh_data.edge_count:
+            bmesh.edges.add(mesh_data.edge_count)
+            bmesh.edges.foreach_set(
+                "vertices", np.asarray(mesh_data.edges, dtype=np.int32)
+            )
+        if mesh_data.polygon_count:
+            bmesh.loops.add(mesh_data.loop_count)
+            bmesh.loops.foreach_set(
+                "vertex_index", np.asarray(mesh_data.loops, dtype=np.int32)
+            )
+            bmesh.polygons.add(mesh_data.polygon_count)
+            bmesh.polygons.foreach_set(
+                "loop_start", np.asarray(mesh_data.loop_starts, dtype=np.int32)
+            )
+            if bpy.app.version < (4, 0, 0):
+                # since 4.0 loop_total is read-only and derived from loop_start
+                bmesh.polygons.foreach_set(
+                    "loop_total", np.asarray(mesh_data.loop_totals, dtype=np.int32)
+                )
+        bmesh.update(calc_edges=True)
+        if func_data["freecad_mesh_hash"]:
+            bmesh["freecad_mesh_hash"] = func_data["freecad_mesh_hash"]
+        if func_data["freecad_shape_crc"]:
+            bmesh["freecad_shape_crc"] = func_data["freecad_shape_crc"]
         return bmesh
 
     def create_bobj_from_bmesh(self, func_data, obj_label, bmesh):
         """Create new object from bmesh."""
-        bobj = bpy.data.objects.new(obj_label, bmesh)
+        bobj = self.data_index.objects.new(obj_label, bmesh)
         # check if we already used the bmesh.
         # if bmesh.name in bpy.data.meshes:
         #     print(
@@ -429,22 +580,27 @@ class ImportFcstd(object):
                 bobj=bobj,
                 obj_label=obj_label,
                 sharemats=self.config["sharemats"],
+                matdatabase=self.matdatabase,
                 report=self.config["report"],
                 report_preline=func_data["pre_line"] + "| ",
             )
-            material_manager.create_new()
+            with self.profiler.phase("materials"), self.profiler.span(
+                "MaterialManager.create_new", object=obj_label
+            ):
+                material_manager.create_new()
         else:
-            print(
-                func_data["pre_line"]
-                + " ignore material import. mesh already has material."
+            log.debug(
+                "{} ignore material import. mesh already has material.",
+                func_data["pre_line"],
             )
         func_data["bobj"] = bobj
         return bobj
 
+    @profiler.traced
     def create_or_get_bmesh(self, pre_line, func_data, mesh_label):
         """Create or get bmesh."""
         pre_line_orig = func_data["pre_line"]
-        print(pre_line_orig + "create_or_get_bmesh")
+        log.debug("{}create_or_get_bmesh", pre_line_orig)
         pre_line = pre_line_orig + "  "
         func_data["pre_line"] = pre_line
 
@@ -452,13 +608,13 @@ class ImportFcstd(object):
         # bmesh_old_name = None
         bmesh_import = True
 
-        print(pre_line + "mesh_label:", mesh_label)
+        log.debug("{}mesh_label: {}", pre_line, mesh_label)
         # print(pre_line + "bpy.data.meshes ({})".format(len(bpy.data.meshes)))
         # for mesh in bpy.data.meshes:
         #     print(pre_line + " - ", mesh)
-        if mesh_label in bpy.data.meshes:
-            bmesh = bpy.data.meshes[mesh_label]
-            print(pre_line + "use found bmesh.")
+        if mesh_label in self.data_index.meshes:
+            bmesh = self.data_index.meshes[mesh_label]
+            log.debug("{}use found bmesh.", pre_line)
             bmesh_import = False
             # print(
             #     pre_line
@@ -475,47 +631,50 @@ class ImportFcstd(object):
             # for obj_name in self.imported_obj_names:
             #     print(pre_line + " - ", obj_name)
             if mesh_label not in self.imported_obj_names and self.config["update"]:
-                if self.config["update_only_modified_meshes"]:
-                    print(pre_line + "update_only_modified_meshes: TODO")
-                    # bmesh.get("freecad_mesh_hash", None)
-                    # func_data["freecad_mesh_hash"]
-                # rename old mesh -
-                # this way the new mesh can get the original name.
-                helper.rename_old_data(bpy.data.meshes, mesh_label)
-                # bmesh_old_name = helper.rename_old_data(bpy.data.meshes, mesh_label)
-                bmesh_import = True
+                if func_data["mesh_unchanged"]:
+                    log.debug("{}update_only_modified_meshes: mesh unchanged.", pre_line)
+                    self.imported_obj_names.add(mesh_label)
+                else:
+                    # rename old mesh -
+                    # this way the new mesh can get the original name.
+                    helper.rename_old_data(self.data_index.meshes, mesh_label)
+                    # bmesh_old_name = helper.rename_old_data(bpy.data.meshes, mesh_label)
+                    bmesh_import = True
         # create bmesh
         if bmesh_import:
-            print(pre_line + "import bmesh.")
-            bmesh = self.create_bmesh_from_func_data(
-                func_data, mesh_label, enable_import_scale=True
+            log.debug("{}import bmesh.", pre_line)
+            with self.profiler.phase("mesh_build"):
+                bmesh = self.create_bmesh_from_func_data(
+                    func_data, mesh_label, enable_import_scale=True
+                )
+            self.profiler.set_object_info(
+                vertices=len(bmesh.vertices), faces=len(bmesh.polygons)
             )
             # print(pre_line + "create_bmesh_from_func_data: ", bmesh)
             # Auto smooth will be applied after import using Blender's internal functionality
             if mesh_label not in self.imported_obj_names:
-                self.imported_obj_names.append(mesh_label)
+                self.imported_obj_names.add(mesh_label)
         # return (bmesh, bmesh_old_name)
         func_data["pre_line"] = pre_line_orig
         return bmesh
 
+    @profiler.traced
     def create_or_update_bobj(self, pre_line, func_data, obj_label, bmesh):
         """Create or update bobj."""
         pre_line_orig = func_data["pre_line"]
-        print(pre_line_orig + "create_or_update_bobj")
+        log.debug("{}create_or_update_bobj", pre_line_orig)
         pre_line = pre_line_orig + "  "
         func_data["pre_line"] = pre_line
         bobj = None
         is_new = False
         bobj_import = True
         # locate existing object (object with same name)
-        if obj_label in bpy.data.objects:
-            bobj = bpy.data.objects[obj_label]
-            print(pre_line + "found bobj!")
+        if obj_label in self.data_index.objects:
+            bobj = self.data_index.objects[obj_label]
+            log.debug("{}found bobj!", pre_line)
             bobj_import = False
             if obj_label not in self.imported_obj_names and self.config["update"]:
-                print(
-                    pre_line + "Replacing existing object mesh: {}" "".format(obj_label)
-                )
+                log.debug("{}Replacing existing object mesh: {}", pre_line, obj_label)
                 # update only the mesh of existing object.
                 # print(self.imported_obj_names)
                 if len(bmesh.materials) <= 0:
@@ -544,6 +703,7 @@ class ImportFcstd(object):
         func_data["pre_line"] = pre_line_orig
         return (is_new, bobj)
 
+    @profiler.traced
     def add_or_update_blender_obj(self, func_data):
         """Create or update object with mesh and material data."""
         """
@@ -554,7 +714,7 @@ class ImportFcstd(object):
                 if not create it
         """
         pre_line_orig = func_data["pre_line"]
-        print(pre_line_orig + "add_or_update_blender_obj")
+        log.debug("{}add_or_update_blender_obj", pre_line_orig)
         pre_line = pre_line_orig + "  "
         func_data["pre_line"] = pre_line
 
@@ -598,30 +758,33 @@ class ImportFcstd(object):
                 self.handle_placement(pre_line, func_data["obj"], bobj)
 
         if bobj.name not in self.imported_obj_names:
-            self.imported_obj_names.append(bobj.name)
+            self.imported_obj_names.add(bobj.name)
         func_data["bobj"] = bobj
         func_data["pre_line"] = pre_line_orig
 
     def sub_collection_add_or_update(self, func_data, collection_label):
         """Part-Collection handle add or update."""
-        print(
-            func_data["pre_line"]
-            + "sub_collection_add_or_update: '{}'".format(collection_label)
+        log.debug(
+            "{}sub_collection_add_or_update: '{}'",
+            func_data["pre_line"],
+            collection_label,
         )
         temp_collection = None
         if self.config["update"]:
-            if collection_label in bpy.data.collections:
-                temp_collection = bpy.data.collections[collection_label]
+            if collection_label in self.data_index.collections:
+                temp_collection = self.data_index.collections[collection_label]
         else:
-            helper.rename_old_data(bpy.data.collections, collection_label)
+            helper.rename_old_data(self.data_index.collections, collection_label)
 
         if not temp_collection:
             # create new
-            temp_collection = bpy.data.collections.new(collection_label)
+            temp_collection = self.data_index.collections.new(collection_label)
             func_data["collection"].children.link(temp_collection)
-            print(
-                func_data["pre_line"] + "'{}' add to '{}' "
-                "".format(func_data["bobj"], func_data["collection"],)
+            log.debug(
+                "{}'{}' add to '{}' ",
+                func_data["pre_line"],
+                func_data["bobj"],
+                func_data["collection"],
             )
         else:
             # bpy.context.scene.collection.children.link(self.fcstd_collection)
@@ -634,9 +797,8 @@ class ImportFcstd(object):
     def set_obj_parent_and_collection(self, pre_line, func_data, bobj):
         """Set Object parent and collection."""
         bobj.parent = func_data["parent_bobj"]
-        print(
-            pre_line + "'{}' set parent to '{}' "
-            "".format(bobj, func_data["parent_bobj"])
+        log.debug(
+            "{}'{}' set parent to '{}' ", pre_line, bobj, func_data["parent_bobj"]
         )
 
         # add object to current collection
@@ -653,38 +815,41 @@ class ImportFcstd(object):
 
     def parent_empty_add_or_update(self, func_data, empty_label):
         """Parent Empty handle add or update."""
-        print(
-            func_data["pre_line"]
-            + "parent_empty_add_or_update: '{}'".format(empty_label)
+        log.debug(
+            "{}parent_empty_add_or_update: '{}'", func_data["pre_line"], empty_label
         )
         pre_line = func_data["pre_line"] + " → "
         empty_bobj = None
 
         obj = func_data["obj"]
 
-        print(
-            pre_line + "current parent_obj ", self.format_obj(func_data["parent_obj"])
+        log.debug(
+            "{}current parent_obj {}",
+            pre_line,
+            b_helper.LazyStr(self.format_obj, func_data["parent_obj"]),
         )
 
-        if empty_label in bpy.data.objects:
+        if empty_label in self.data_index.objects:
             # print(
             #     pre_line +
             #     "'{}' already in objects list.".format(empty_label)
             # )
             if self.config["update"]:
-                empty_bobj = bpy.data.objects[empty_label]
+                empty_bobj = self.data_index.objects[empty_label]
                 # print(
                 #     pre_line +
                 #     "update: '{}'".format(empty_bobj)
                 # )
             else:
-                renamed_to = helper.rename_old_data(bpy.data.objects, empty_label)
-                print(pre_line + "overwrite - renamed to " "'{}'".format(renamed_to))
+                renamed_to = helper.rename_old_data(
+                    self.data_index.objects, empty_label
+                )
+                log.debug("{}overwrite - renamed to '{}'", pre_line, renamed_to)
 
         flag_new = False
         if empty_bobj is None:
-            print(pre_line + "create new empty_bobj '{}'".format(empty_label))
-            empty_bobj = bpy.data.objects.new(name=empty_label, object_data=None)
+            log.debug("{}create new empty_bobj '{}'", pre_line, empty_label)
+            empty_bobj = self.data_index.objects.new(name=empty_label, object_data=None)
             empty_bobj.empty_display_size = self.config["scale"] * 10
             self.set_obj_parent_and_collection(pre_line, func_data, empty_bobj)
 
@@ -734,7 +899,7 @@ class ImportFcstd(object):
         self, func_data, pre_line, obj_label, base_collection
     ):
         """Create instance of given collection."""
-        result_bobj = bpy.data.objects.new(name=obj_label, object_data=None)
+        result_bobj = self.data_index.objects.new(name=obj_label, object_data=None)
         result_bobj.instance_collection = base_collection
         result_bobj.instance_type = "COLLECTION"
         result_bobj.empty_display_size = self.config["scale"] * 10
@@ -742,9 +907,8 @@ class ImportFcstd(object):
         # TODO: CHECK where to add this!
         if func_data["collection"]:
             func_data["collection"].objects.link(result_bobj)
-            print(
-                pre_line + "'{}' add to '{}' "
-                "".format(result_bobj, func_data["collection"])
+            log.debug(
+                "{}'{}' add to '{}' ", pre_line, result_bobj, func_data["collection"]
             )
         # result_bobj.parent = func_data["parent_bobj"]
         # result_bobj.parent = parent_obj
@@ -763,8 +927,10 @@ class ImportFcstd(object):
             if link_target_bobj:
                 object_data = link_target_bobj.data
             else:
-                object_data = bpy.data.meshes.new(name=obj_label + ".temp")
-            result_bobj = bpy.data.objects.new(name=obj_label, object_data=object_data)
+                object_data = self.data_index.meshes.new(name=obj_label + ".temp")
+            result_bobj = self.data_index.objects.new(
+                name=obj_label, object_data=object_data
+            )
             result_bobj.empty_display_size = self.config["scale"] * 10
         else:
             self.config["report"](
@@ -787,6 +953,7 @@ class ImportFcstd(object):
                 )
         return result_bobj
 
+    @profiler.traced
     def handle__sub_object_import(
         self,
         *,
@@ -799,7 +966,7 @@ class ImportFcstd(object):
     ):
         """Handle sub object."""
         pre_line_orig = func_data["pre_line"]
-        print(pre_line_orig + "handle__sub_object_import")
+        log.debug("{}handle__sub_object_import", pre_line_orig)
         pre_line = pre_line_orig + "  "
         func_data["pre_line"] = pre_line
         link_source = None
@@ -812,21 +979,23 @@ class ImportFcstd(object):
                 # parent_obj,
                 obj,
             )
-            print(
-                pre_line
-                + "set special link obj_label: "
-                + b_helper.colors.fg.green
-                + "'{}'".format(obj_label)
-                + b_helper.colors.reset
+            log.debug(
+                "{}set special link obj_label: {}'{}'{}",
+                pre_line,
+                b_helper.colors.fg.green,
+                obj_label,
+                b_helper.colors.reset,
             )
         link_source = func_data["link_source"]
         if is_link_source:
             link_source = obj
         # debug output
-        print(pre_line + ("*" * 42))
-        print(pre_line + "obj:         " + self.format_obj(obj))
-        print(pre_line + "parent_obj:  " + self.format_obj(parent_obj))
-        print(pre_line + "parent_bobj:  {}".format(parent_bobj))
+        log.debug("{}{}", pre_line, "*" * 42)
+        log.debug("{}obj:        {}", pre_line, b_helper.LazyStr(self.format_obj, obj))
+        log.debug(
+            "{}parent_obj: {}", pre_line, b_helper.LazyStr(self.format_obj, parent_obj)
+        )
+        log.debug("{}parent_bobj: {}", pre_line, parent_bobj)
         # # print(pre_line + "func_data[is_link]:  {}".format(func_data["is_link"]))
         # is_link_color = b_helper.colors.fg.red
         # if func_data["is_link"]:
@@ -869,12 +1038,13 @@ class ImportFcstd(object):
         func_data_new["parent_bobj"] = parent_bobj
         func_data_new["is_link"] = func_data["is_link"]
         func_data_new["link_source"] = link_source
-        print(pre_line + "import_obj ...")
-        self.import_obj(
-            func_data=func_data_new, pre_line=pre_line,
+        log.debug("{}import_obj ...", pre_line)
+        self.import_queue.schedule(
+            self.import_obj_task, func_data=func_data_new, pre_line=pre_line,
         )
         func_data["pre_line"] = pre_line_orig
 
+    @profiler.traced
     def handle__sub_objects(
         self,
         func_data,
@@ -898,11 +1068,11 @@ class ImportFcstd(object):
         pre_line_orig = func_data["pre_line"]
         pre_line = pre_line_follow
         func_data["pre_line"] = pre_line
-        print(
-            pre_line_start
-            + "handle__sub_objects"
-            # + " - sub_objects '{}'"
-            # + "".format(sub_objects)
+        log.debug(
+            "{}handle__sub_objects",
+            pre_line_start,
+            # " - sub_objects '{}'"
+            # sub_objects
         )
         sub_filter_visible = False
         if not isinstance(include_only_visible, list):
@@ -924,20 +1094,20 @@ class ImportFcstd(object):
         #     "is_link_source '{}'"
         #     "".format(is_link_source)
         # )
-        print(pre_line + "parent_obj:  " + self.format_obj(parent_obj))
-        print(pre_line + "parent_bobj:  {}".format(parent_bobj))
+        log.debug(
+            "{}parent_obj: {}", pre_line, b_helper.LazyStr(self.format_obj, parent_obj)
+        )
+        log.debug("{}parent_bobj: {}", pre_line, parent_bobj)
         sub_objects = fc_helper.filtered_objects(
             sub_objects, include_only_visible=sub_filter_visible
         )
-        self.config["report"](
-            {"INFO"},
-            (
-                b_helper.colors.bold
-                + b_helper.colors.fg.purple
-                + "Import {} Recusive:".format(len(sub_objects))
-                + b_helper.colors.reset
-            ),
-            pre_line=pre_line_sub_special,
+        log.debug(
+            "{}{}{}Import {} Recusive:{}",
+            pre_line_sub_special,
+            b_helper.colors.bold,
+            b_helper.colors.fg.purple,
+            len(sub_objects),
+            b_helper.colors.reset,
         )
         # is_link_source = False
         # # if func_data["is_link"] and len(sub_objects) > 1:
@@ -967,21 +1137,24 @@ class ImportFcstd(object):
                     ),
                 )
         func_data["pre_line"] = pre_line_orig
+        self.import_queue.schedule(
+            self.handle__sub_objects_done, func_data, parent_bobj, pre_line_end
+        )
 
+    def handle__sub_objects_done(self, func_data, parent_bobj, pre_line_end):
+        """Finish sub objects (runs after all of them are imported)."""
         if func_data["bobj"] is None:
             func_data["bobj"] = parent_bobj
 
-        self.config["report"](
-            {"INFO"},
-            (
-                b_helper.colors.bold
-                + b_helper.colors.fg.purple
-                + "done."
-                + b_helper.colors.reset
-            ),
-            pre_line=pre_line_end,
+        log.debug(
+            "{}{}{}done.{}",
+            pre_line_end,
+            b_helper.colors.bold,
+            b_helper.colors.fg.purple,
+            b_helper.colors.reset,
         )
 
+    @profiler.traced
     def handle__object_with_sub_objects(
         self, func_data, sub_objects, include_only_visible=True, is_link_source=False,
     ):
@@ -991,7 +1164,7 @@ class ImportFcstd(object):
         parent_label = self.get_obj_label(parent_obj)
         if func_data["is_link"] and func_data["obj_label"]:
             parent_label = func_data["obj_label"]
-        print(pre_line + "handle__object_with_sub_objects '{}'".format(parent_label))
+        log.debug("{}handle__object_with_sub_objects '{}'", pre_line, parent_label)
         # print(pre_line + "is_link_source '{}'".format(is_link_source))
         # pre_line += "→ "
 
@@ -1006,11 +1179,11 @@ class ImportFcstd(object):
         self.print_obj(
             func_data["parent_obj"], pre_line=pre_line + "# func_data[parent_obj]",
         )
-        print(pre_line + "# func_data[parent_bobj]", func_data["parent_bobj"])
+        log.debug("{}# func_data[parent_bobj] {}", pre_line, func_data["parent_bobj"])
 
         self.parent_empty_add_or_update(func_data, parent_label)
         parent_bobj = func_data["parent_bobj"]
-        print(pre_line + "fresh created parent_bobj ", parent_bobj)
+        log.debug("{}fresh created parent_bobj {}", pre_line, parent_bobj)
 
         if len(sub_objects) > 0:
             self.handle__sub_objects(
@@ -1023,18 +1196,20 @@ class ImportFcstd(object):
                 is_link_source=is_link_source,
             )
         else:
-            self.config["report"](
-                {"INFO"},
-                (b_helper.colors.fg.darkgrey + "→ no childs." + b_helper.colors.reset),
-                pre_line=pre_line,
+            log.debug(
+                "{}{}→ no childs.{}",
+                pre_line,
+                b_helper.colors.fg.darkgrey,
+                b_helper.colors.reset,
             )
 
     # ##########################################
     # Arrays and similar
+    @profiler.traced
     def handle__ObjectWithElementList(self, func_data, is_link_source=False):
         """Handle Part::Feature objects."""
         pre_line_orig = func_data["pre_line"]
-        print(pre_line_orig + "handle__ObjectWithElementList")
+        log.debug("{}handle__ObjectWithElementList", pre_line_orig)
         pre_line = pre_line_orig + "  "
         func_data["pre_line"] = pre_line
         # fc_helper.print_objects(
@@ -1051,12 +1226,14 @@ class ImportFcstd(object):
         func_data["pre_line"] = pre_line_orig
 
     # Part::FeaturePhython
+    @profiler.traced
     def handle__PartFeaturePython_Array(self, func_data):
         """Handle Part::Feature objects."""
         pre_line_orig = func_data["pre_line"]
-        print(
-            pre_line_orig + "handle__PartFeaturePython_Array",
-            self.format_obj(func_data["obj"]),
+        log.debug(
+            "{}handle__PartFeaturePython_Array {}",
+            pre_line_orig,
+            b_helper.LazyStr(self.format_obj, func_data["obj"]),
         )
         pre_line = pre_line_orig + "  "
         func_data["pre_line"] = pre_line
@@ -1070,9 +1247,10 @@ class ImportFcstd(object):
         # print(pre_line + "expand Array")
         # TODO: this currently has only any effect in the GUI
         func_data["obj"].ExpandArray = True
-        self.doc.recompute()
+        # only the array and its dependencies need the new ElementList
+        fc_helper.recompute_objects(self.doc, [func_data["obj"]])
         # print(pre_line + "ExpandArray:", func_data["obj"].ExpandArray)
-        print(pre_line + "ElementList:", func_data["obj"].ElementList)
+        log.debug("{}ElementList: {}", pre_line, func_data["obj"].ElementList)
         # print(
         #     pre_line
         #     + "call handle__ObjectWithElementList with "
@@ -1084,12 +1262,14 @@ class ImportFcstd(object):
         self.handle__ObjectWithElementList(func_data, is_link_source=True)
         func_data["pre_line"] = pre_line_orig
 
+    @profiler.traced
     def handle__PartFeaturePython_ArchWithHostChilds(self, func_data):
         """Handle Part::Feature Arch objects with HostsChilds."""
         pre_line_orig = func_data["pre_line"]
-        print(
-            pre_line_orig + "handle__PartFeaturePython_ArchWithHostChilds",
-            self.format_obj(func_data["obj"]),
+        log.debug(
+            "{}handle__PartFeaturePython_ArchWithHostChilds {}",
+            pre_line_orig,
+            b_helper.LazyStr(self.format_obj, func_data["obj"]),
         )
         pre_line = pre_line_orig + "  "
         func_data["pre_line"] = pre_line
@@ -1099,7 +1279,7 @@ class ImportFcstd(object):
         self.handle__PartFeature(func_data)
         # handle childs
         original_parent = func_data["parent_bobj"]
-        obj_childs = fc_helper.object_get_HostChilds(obj)
+        obj_childs = fc_helper.object_get_HostChilds(obj, self.object_graph)
         # print(pre_line + "obj_childs:", obj_childs)
         # print(pre_line + "len(obj_childs):", len(obj_childs))
         self.handle__object_with_sub_objects(func_data, obj_childs)
@@ -1107,6 +1287,7 @@ class ImportFcstd(object):
         func_data["parent_bobj"] = original_parent
         func_data["pre_line"] = pre_line_orig
 
+    @profiler.traced
     def handle__PartFeaturePython(self, func_data, pre_line=""):
         """Handle Part::FeaturePython objects."""
         obj = func_data["obj"]
@@ -1122,7 +1303,7 @@ class ImportFcstd(object):
                 ),
                 pre_line,
             )
-        elif len(fc_helper.object_get_HostChilds(obj)) > 0:
+        elif self.has_host_children(obj):
             # Arch Workbench - ArchComponent
             self.handle__PartFeaturePython_ArchWithHostChilds(func_data)
         elif hasattr(obj, "Hosts"):
@@ -1144,12 +1325,16 @@ class ImportFcstd(object):
             self.handle__PartFeature(func_data)
 
     # App::Part
+    @profiler.traced
     def handle__AppPart(self, func_data):
         """Handle App:Part type."""
         # pre_line = func_data["pre_line"]
-        self.handle__object_with_sub_objects(func_data, func_data["obj"].Group)
+        self.handle__object_with_sub_objects(
+            func_data, self.get_group_children(func_data["obj"])
+        )
 
     # App::Link*
+    @profiler.traced
     def add_or_update_collection_instance(
         self, *, func_data, obj, obj_label, instance_target_label,
     ):
@@ -1163,27 +1348,22 @@ class ImportFcstd(object):
         # pre_line_sub = pre_line_orig + "├─ "
         pre_line_follow = pre_line_orig + "│   "
         pre_line_end = pre_line_orig + "└────────── "
-        print(
-            pre_line_start + "add_or_update_collection_instance '{}'"
-            "".format(obj_label)
-        )
+        log.debug("{}add_or_update_collection_instance '{}'", pre_line_start, obj_label)
         func_data["pre_line"] = pre_line_follow
         # pre_line = pre_line_sub
         pre_line = pre_line_follow
 
-        print(pre_line + "obj_label '{}'".format(obj_label))
-        print(pre_line + "instance_target_label '{}'".format(instance_target_label))
-        print(
-            pre_line + "func_data[collection] '{}'" "".format(func_data["collection"])
-        )
+        log.debug("{}obj_label '{}'", pre_line, obj_label)
+        log.debug("{}instance_target_label '{}'", pre_line, instance_target_label)
+        log.debug("{}func_data[collection] '{}'", pre_line, func_data["collection"])
 
         base_collection = None
         bobj = None
-        if instance_target_label in bpy.data.collections:
-            base_collection = bpy.data.collections[instance_target_label]
+        if instance_target_label in self.data_index.collections:
+            base_collection = self.data_index.collections[instance_target_label]
             flag_new = False
-            if obj_label in bpy.data.objects:
-                bobj = bpy.data.objects[obj_label]
+            if obj_label in self.data_index.objects:
+                bobj = self.data_index.objects[obj_label]
             else:
                 bobj = self.create_collection_instance(
                     func_data, pre_line_follow, obj_label, base_collection
@@ -1212,9 +1392,10 @@ class ImportFcstd(object):
                 pre_line,
             )
             # return False
-        print(pre_line_end + "")
+        log.debug("{}", pre_line_end)
         func_data["pre_line"] = pre_line_orig
 
+    @profiler.traced
     def add_or_update_link_instance(
         self, *, func_data, obj, obj_label, link_target_obj, link_target_label,
     ):
@@ -1228,19 +1409,19 @@ class ImportFcstd(object):
         # pre_line_sub = pre_line_orig + "├─ "
         pre_line_follow = pre_line_orig + "│   "
         pre_line_end = pre_line_orig + "└────────── "
-        print(pre_line_start + "add_or_update_link_instance '{}'" "".format(obj_label))
+        log.debug("{}add_or_update_link_instance '{}'", pre_line_start, obj_label)
         func_data["pre_line"] = pre_line_follow
         # pre_line = pre_line_sub
         pre_line = pre_line_follow
 
-        print(pre_line + "obj_label '{}'".format(obj_label))
-        print(pre_line + "link_target_label '{}'".format(link_target_label))
+        log.debug("{}obj_label '{}'", pre_line, obj_label)
+        log.debug("{}link_target_label '{}'", pre_line, link_target_label)
 
         link_target_bobj = None
         bobj = None
-        if link_target_label in bpy.data.objects:
-            link_target_bobj = bpy.data.objects[link_target_label]
-            print(pre_line + "# link_target_bobj ", link_target_bobj)
+        if link_target_label in self.data_index.objects:
+            link_target_bobj = self.data_index.objects[link_target_label]
+            log.debug("{}# link_target_bobj {}", pre_line, link_target_bobj)
         else:
             self.config["report"](
                 {"WARNING"},
@@ -1253,14 +1434,14 @@ class ImportFcstd(object):
             )
             # return False
         flag_new = False
-        if obj_label in bpy.data.objects:
-            bobj = bpy.data.objects[obj_label]
-            print(pre_line + "# bobj already here: ", bobj)
+        if obj_label in self.data_index.objects:
+            bobj = self.data_index.objects[obj_label]
+            log.debug("{}# bobj already here: {}", pre_line, bobj)
         else:
             bobj = self.create_link_instance(
                 func_data, pre_line_follow, obj_label, link_target_bobj, link_target_obj
             )
-            print(pre_line + "# created new bobj: ", bobj)
+            log.debug("{}# created new bobj: {}", pre_line, bobj)
             flag_new = True
         # print(
         #     pre_line +
@@ -1285,26 +1466,28 @@ class ImportFcstd(object):
             #     pre_line + "    "
             #     "bobj '{}' ".format(bobj.location)
             # )
-            print(pre_line + "# bobj.data: ", bobj.data)
+            log.debug("{}# bobj.data: {}", pre_line, bobj.data)
             if bobj.data:
                 if bobj.data.name != link_target_label:
-                    if link_target_label in bpy.data.meshes:
-                        print(
-                            pre_line
-                            + "update / relink '{}' to original link target '{}'"
-                            "".format(obj_label, link_target_label)
+                    if link_target_label in self.data_index.meshes:
+                        log.debug(
+                            "{}update / relink '{}' to original link target '{}'",
+                            pre_line,
+                            obj_label,
+                            link_target_label,
                         )
                         old_mesh = bobj.data
-                        bobj.data = bpy.data.meshes[link_target_label]
+                        bobj.data = self.data_index.meshes[link_target_label]
                         # clean up temporary mesh
                         if old_mesh.users == 0:
-                            bpy.data.meshes.remove(old_mesh)
+                            self.data_index.meshes.remove(old_mesh)
                     else:
-                        print(
-                            pre_line + "→ link_target_label not in bpy.data.meshes "
+                        log.debug(
+                            "{}→ link_target_label not in bpy.data.meshes "
                             "Something wired going on.... "
                             "it seems to working..."
-                            "TODO: maybe CHECK"
+                            "TODO: maybe CHECK",
+                            pre_line,
                         )
                 # else:
                 #     print(
@@ -1313,14 +1496,15 @@ class ImportFcstd(object):
                 #         "".format(bobj.data.name, link_target_label)
                 #     )
             else:
-                print(pre_line + "→ bobj.data == None " "→ maybe this is a Empty.")
+                log.debug("{}→ bobj.data == None → maybe this is a Empty.", pre_line)
 
             func_data["bobj"] = bobj
             func_data["update_tree"] = True
 
-        print(pre_line_end + "")
+        log.debug("{}", pre_line_end)
         func_data["pre_line"] = pre_line_orig
 
+    @profiler.traced
     def add_or_update_link_target(
         self, *, func_data, obj, obj_label, obj_linkedobj, obj_linkedobj_label,
     ):
@@ -1349,12 +1533,11 @@ class ImportFcstd(object):
         #     self.imported_obj_names
         # )
 
-        if obj_linkedobj_label in bpy.data.objects or (
+        if obj_linkedobj_label in self.data_index.objects or (
             obj_linkedobj_label in self.imported_obj_names
         ):
-            print(
-                pre_line + "→ already imported/updated '{}'."
-                "".format(obj_linkedobj_label)
+            log.debug(
+                "{}→ already imported/updated '{}'.", pre_line, obj_linkedobj_label
             )
         else:
             self.print_obj(
@@ -1390,70 +1573,87 @@ class ImportFcstd(object):
             # set collection to link_target
             # this way the imports get definitly added to the scene.
             # func_data["collection"] = self.link_targets
-            print(pre_line + "§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§")
+            log.debug("{}{}", pre_line, "§" * 42)
             func_data_obj_linked = self.create_func_data()
             func_data_obj_linked["obj"] = obj_linkedobj
             func_data_obj_linked["collection"] = self.link_targets
             func_data_obj_linked["collection_parent"] = None
             func_data_obj_linked["parent_obj"] = obj
             func_data_obj_linked["parent_bobj"] = None
-            func_data_obj_linked = self.import_obj(
-                func_data=func_data_obj_linked, pre_line=pre_line + "    ",
+            self.import_queue.schedule(
+                self.import_obj_task,
+                func_data=func_data_obj_linked,
+                pre_line=pre_line + "    ",
+            )
+            self.import_queue.schedule(
+                self.add_or_update_link_target_done,
+                func_data=func_data,
+                func_data_obj_linked=func_data_obj_linked,
+                obj_linkedobj_label=obj_linkedobj_label,
+                pre_line=pre_line,
             )
-            print(pre_line + "§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§§")
-            bobj = func_data_obj_linked["bobj"]
-            # print(
-            #    pre_line +
-            #    "func_data_obj_linked '{}' "
-            #    "".format(func_data_obj_linked)
-            # )
-            # pprint.pprint(func_data_obj_linked)
-
-            # fix parent linking
-            # parent_obj = obj_linked.getParentGeoFeatureGroup()
-            # parent_label = self.get_obj_label(parent_obj)
-            # if parent_label:
-            #     parent_bobj = bpy.data.objects[parent_label]
-            #     if parent_bobj:
-            #         bobj.parent = parent_bobj
-            #         print(
-            #             pre_line +
-            #             "'{}' set parent to '{}' "
-            #             "".format(bobj, parent_bobj)
-            #         )
-            # this has no parent as we use only the raw obj.
-            self.print_obj(func_data_obj_linked["obj"], pre_line + "$ used obj: ")
-            print(pre_line + "$ created bobj: ", bobj)
-            print(pre_line + "$ bobj.parent: ", bobj.parent)
-            print(pre_line + "$ func_data[parent_bobj]: ", func_data["parent_bobj"])
-            # bobj.parent = None
-            self.reset_placement_position(bobj)
 
-            # print(
-            #     pre_line + "$ parent_bobj: ",
-            #     func_data_obj_linked["parent_bobj"]
-            # )
-            # print(
-            #     pre_line + "$ collection: ",
-            #     func_data_obj_linked["collection"]
-            # )
-            # print(
-            #     pre_line + "$ collection_parent: ",
-            #     func_data_obj_linked["collection_parent"]
-            # )
+    def add_or_update_link_target_done(
+        self, *, func_data, func_data_obj_linked, obj_linkedobj_label, pre_line,
+    ):
+        """Add imported link target to its collection (runs after its import)."""
+        log.debug("{}{}", pre_line, "§" * 42)
+        bobj = func_data_obj_linked["bobj"]
+        # print(
+        #    pre_line +
+        #    "func_data_obj_linked '{}' "
+        #    "".format(func_data_obj_linked)
+        # )
+        # pprint.pprint(func_data_obj_linked)
+
+        # fix parent linking
+        # parent_obj = obj_linked.getParentGeoFeatureGroup()
+        # parent_label = self.get_obj_label(parent_obj)
+        # if parent_label:
+        #     parent_bobj = bpy.data.objects[parent_label]
+        #     if parent_bobj:
+        #         bobj.parent = parent_bobj
+        #         print(
+        #             pre_line +
+        #             "'{}' set parent to '{}' "
+        #             "".format(bobj, parent_bobj)
+        #         )
+        # this has no parent as we use only the raw obj.
+        self.print_obj(func_data_obj_linked["obj"], pre_line + "$ used obj: ")
+        log.debug("{}$ created bobj: {}", pre_line, bobj)
+        log.debug("{}$ bobj.parent: {}", pre_line, bobj.parent)
+        log.debug("{}$ func_data[parent_bobj]: {}", pre_line, func_data["parent_bobj"])
+        # bobj.parent = None
+        self.reset_placement_position(bobj)
 
-            # created collection for new link target
-            func_data_obj_linked["collection"] = self.link_targets
-            self.sub_collection_add_or_update(func_data_obj_linked, obj_linkedobj_label)
-            # self.parent_empty_add_or_update(
-            #     func_data_obj_linked, obj_linkedobj_label)
-            # add new object to collection.
-            func_data_obj_linked["collection"].objects.link(bobj)
-            print(
-                pre_line + "'{}' add to '{}' "
-                "".format(bobj, func_data_obj_linked["collection"])
-            )
+        # print(
+        #     pre_line + "$ parent_bobj: ",
+        #     func_data_obj_linked["parent_bobj"]
+        # )
+        # print(
+        #     pre_line + "$ collection: ",
+        #     func_data_obj_linked["collection"]
+        # )
+        # print(
+        #     pre_line + "$ collection_parent: ",
+        #     func_data_obj_linked["collection_parent"]
+        # )
+
+        # created collection for new link target
+        func_data_obj_linked["collection"] = self.link_targets
+        self.sub_collection_add_or_update(func_data_obj_linked, obj_linkedobj_label)
+        # self.parent_empty_add_or_update(
+        #     func_data_obj_linked, obj_linkedobj_label)
+        # add new object to collection.
+        func_data_obj_linked["collection"].objects.link(bobj)
+        log.debug(
+            "{}'{}' add to '{}' ",
+            pre_line,
+            bobj,
+            func_data_obj_linked["collection"],
+        )
 
+    @profiler.traced
     def handle__AppLink(self, func_data):
         """Handle App::Link objects."""
         pre_line_orig = func_data["pre_line"]
@@ -1465,15 +1665,13 @@ class ImportFcstd(object):
         # pre_line_sub = pre_line_orig + "├─ "
         pre_line_follow = pre_line_orig + "│   "
         pre_line_end = pre_line_orig + "└────────── "
-        print(pre_line_start + "handle__AppLink")
+        log.debug("{}handle__AppLink", pre_line_start)
         func_data["pre_line"] = pre_line_follow
         # pre_line = pre_line_sub
         pre_line = pre_line_follow
 
         obj = func_data["obj"]
-        obj_linkedobj = func_data["obj"].LinkedObject
-        if isinstance(obj_linkedobj, tuple):
-            obj_linkedobj = obj_linkedobj[0]
+        obj_linkedobj = self.get_link_target(obj)
         # print(pre_line + "obj_linkedobj :", obj_linkedobj)
         # self.config["report"]({'WARNING'}, (
         #     "'{}' ('{s}') of type '{}': "
@@ -1505,10 +1703,10 @@ class ImportFcstd(object):
             func_data["is_link"] = True
 
             if hasattr(obj, "ElementList") and len(obj.ElementList) > 0:
-                print(pre_line + "ElementList > 0")
+                log.debug("{}ElementList > 0", pre_line)
                 self.handle__ObjectWithElementList(func_data)
             else:
-                print(pre_line + "Single Element → fake list")
+                log.debug("{}Single Element → fake list", pre_line)
                 # if target is of Body type get real link target
                 # this excludes the link → link → link chain...
                 # try:
@@ -1519,7 +1717,7 @@ class ImportFcstd(object):
                 #     print(pre_line + "use recusive inner target")
                 #     obj_linkedobj = obj_linkedobj.getLinkedObject()
                 if obj_linkedobj.getLinkedObject().isDerivedFrom("Part::Feature"):
-                    print(pre_line + "use recusive inner target")
+                    log.debug("{}use recusive inner target", pre_line)
                     obj_linkedobj = obj_linkedobj.getLinkedObject()
                 self.handle__object_with_sub_objects(
                     func_data, [obj_linkedobj], include_only_visible=[True]
@@ -1532,9 +1730,10 @@ class ImportFcstd(object):
                 ("Warning: '{}' LinkedObject is NONE → skipping." "".format(obj_label)),
                 pre_line,
             )
-        print(pre_line_end + "")
+        log.debug("{}", pre_line_end)
         func_data["pre_line"] = pre_line_orig
 
+    @profiler.traced
     def handle__AppLinkElement(self, func_data, obj_linkedobj=None):
         """Handle App::LinkElement objects."""
         pre_line_orig = func_data["pre_line"]
@@ -1546,8 +1745,8 @@ class ImportFcstd(object):
         pre_line_start = pre_line_orig + "┌ "
         # pre_line_sub = pre_line_orig + "├─ "
         pre_line_follow = pre_line_orig + "│   "
-        pre_line_end = pre_line_orig + "└────────── "
-        print(pre_line_start + "handle__AppLinkElement")
+        # the end line is logged by `handle__AppLinkElement_instance`
+        log.debug("{}handle__AppLinkElement", pre_line_start)
         func_data["pre_line"] = pre_line_follow
         # pre_line = pre_line_sub
         pre_line = pre_line_follow
@@ -1569,7 +1768,7 @@ class ImportFcstd(object):
         #     parent_obj_label in bpy.data.objects
         # ):
         #     func_data["parent_bobj"] = bpy.data.objects[parent_obj_label]
-        print(pre_line + "func_data[parent_bobj]:", func_data["parent_bobj"])
+        log.debug("{}func_data[parent_bobj]: {}", pre_line, func_data["parent_bobj"])
 
         # obj_label = self.get_obj_combined_label(parent_obj, obj)
         obj_label = self.get_obj_label(obj)
@@ -1580,11 +1779,21 @@ class ImportFcstd(object):
 
         # print(pre_line + "collection:", func_data["collection"])
         # print(pre_line + "parent_obj_label:", parent_obj_label)
-        print(pre_line + "obj_label:", obj_label)
-        print(pre_line + "obj_linkedobj_label:", obj_linkedobj_label)
-        fc_helper.print_obj(parent_obj, pre_line=pre_line + "parent_obj   : ")
-        fc_helper.print_obj(obj, pre_line=pre_line + "obj          : ")
-        fc_helper.print_obj(obj_linkedobj, pre_line=pre_line + "obj_linkedobj: ")
+        log.debug("{}obj_label: {}", pre_line, obj_label)
+        log.debug("{}obj_linkedobj_label: {}", pre_line, obj_linkedobj_label)
+        log.debug(
+            "{}parent_obj   : {}",
+            pre_line,
+            b_helper.LazyStr(fc_helper.format_obj, parent_obj),
+        )
+        log.debug(
+            "{}obj          : {}", pre_line, b_helper.LazyStr(fc_helper.format_obj, obj)
+        )
+        log.debug(
+            "{}obj_linkedobj: {}",
+            pre_line,
+            b_helper.LazyStr(fc_helper.format_obj, obj_linkedobj),
+        )
         # fc_helper.print_obj(obj_linked.LinkedObject, pre_line=pre_line)
 
         if not self.config["links_as_collectioninstance"]:
@@ -1603,7 +1812,24 @@ class ImportFcstd(object):
             obj_linkedobj=obj_linkedobj,
             obj_linkedobj_label=obj_linkedobj_label,
         )
+        func_data["pre_line"] = pre_line_orig
+        # the instance needs the (scheduled) link target import.
+        self.import_queue.schedule(
+            self.handle__AppLinkElement_instance,
+            func_data=func_data,
+            obj=obj,
+            obj_label=obj_label,
+            obj_linkedobj=obj_linkedobj,
+            obj_linkedobj_label=obj_linkedobj_label,
+        )
 
+    def handle__AppLinkElement_instance(
+        self, *, func_data, obj, obj_label, obj_linkedobj, obj_linkedobj_label,
+    ):
+        """Add or update the instance of the link target."""
+        pre_line_orig = func_data["pre_line"]
+        pre_line_end = pre_line_orig + "└────────── "
+        func_data["pre_line"] = pre_line_orig + "│   "
         if self.config["links_as_collectioninstance"]:
             self.add_or_update_collection_instance(
                 func_data=func_data,
@@ -1619,11 +1845,12 @@ class ImportFcstd(object):
                 link_target_obj=obj_linkedobj,
                 link_target_label=obj_linkedobj_label,
             )
-        print(pre_line_end + "")
+        log.debug("{}", pre_line_end)
         func_data["pre_line"] = pre_line_orig
 
     # ##########################################
     # 'Arch' object types
+    @profiler.traced
     def handle__object_hosts(self, func_data):
         """Handle object with hosts attribute (Arch Workbench)."""
         pre_line = func_data["pre_line"]
@@ -1631,13 +1858,13 @@ class ImportFcstd(object):
         obj_host = obj.Hosts[0]
         obj_label = self.get_obj_label(obj)
         obj_host_label = self.get_obj_label(obj_host)
-        print(pre_line + "handle__object_hosts '{}'".format(obj_label))
-        print(pre_line + "obj_host_label '{}'".format(obj_host_label))
+        log.debug("{}handle__object_hosts '{}'", pre_line, obj_label)
+        log.debug("{}obj_host_label '{}'", pre_line, obj_host_label)
         bobj = func_data["bobj"]
-        bobj_host = bpy.data.objects[obj_host_label]
+        bobj_host = self.data_index.objects[obj_host_label]
         if bobj_host:
-            print(pre_line + "bobj_host '{}'".format(bobj_host))
-            print(pre_line + "bobj_host.parent '{}'".format(bobj_host.parent))
+            log.debug("{}bobj_host '{}'", pre_line, bobj_host)
+            log.debug("{}bobj_host.parent '{}'", pre_line, bobj_host.parent)
             # Arch Wall Objects are no collection things - so we need to use the parent of it...
             # in the hope that this works...
             if bobj_host.parent:
@@ -1656,119 +1883,76 @@ class ImportFcstd(object):
     # 'real' object types
 
     # Part::Feature
-    def handle_shape_edge(self, func_data, edge):
-        """Handle edges that are not part of a face."""
-        if self.hascurves(edge):
-            # TODO use tessellation value
-            dv = edge.discretize(9)
-            for i in range(len(dv) - 1):
-                dv1 = [dv[i].x, dv[i].y, dv[i].z]
-                dv2 = [dv[i + 1].x, dv[i + 1].y, dv[i + 1].z]
-                if dv1 not in func_data["verts"]:
-                    func_data["verts"].append(dv1)
-                if dv2 not in func_data["verts"]:
-                    func_data["verts"].append(dv2)
-                func_data["edges"].append(
-                    [func_data["verts"].index(dv1), func_data["verts"].index(dv2)]
-                )
-        else:
-            e = []
-            for vert in edge.Vertexes:
-                # TODO discretize non-linear edges
-                v = [vert.X, vert.Y, vert.Z]
-                if v not in func_data["verts"]:
-                    func_data["verts"].append(v)
-                e.append(func_data["verts"].index(v))
-            func_data["edges"].append(e)
-
-    def convert_face_to_polygon(self, func_data, face, faceedges):
-        """Convert face to polygons."""
-        import Part
-
-        if (
-            (len(face.Wires) > 1)
-            or (not isinstance(face.Surface, Part.Plane))
-            or self.hascurves(face)
-        ):
-            # face has holes or is curved, so we need to triangulate it
-            rawdata = face.tessellate(self.config["tessellation"])
-            for v in rawdata[0]:
-                vl = [v.x, v.y, v.z]
-                if vl not in func_data["verts"]:
-                    func_data["verts"].append(vl)
-            for f in rawdata[1]:
-                nf = []
-                for vi in f:
-                    nv = rawdata[0][vi]
-                    nf.append(func_data["verts"].index([nv.x, nv.y, nv.z]))
-                func_data["faces"].append(nf)
-            func_data["matindex"].append(len(rawdata[1]))
-        else:
-            f = []
-            ov = face.OuterWire.OrderedVertexes
-            for v in ov:
-                vl = [v.X, v.Y, v.Z]
-                if vl not in func_data["verts"]:
-                    func_data["verts"].append(vl)
-                f.append(func_data["verts"].index(vl))
-            # FreeCAD doesn't care about func_data["verts"] order.
-            # Make sure our loop goes clockwise
-            c = face.CenterOfMass
-            v1 = ov[0].Point.sub(c)
-            v2 = ov[1].Point.sub(c)
-            n = face.normalAt(0, 0)
-            if (v1.cross(v2)).getAngle(n) > 1.57:
-                # inverting func_data["verts"] order
-                # if the direction is counterclockwise
-                f.reverse()
-            func_data["faces"].append(f)
-            func_data["matindex"].append(1)
-        for e in face.Edges:
-            faceedges.append(e.hashCode())
-
-    def handle_shape_faces(self, func_data, shape, faceedges):
-        """Convert faces to polygons."""
-        if self.config["triangulate_meshes"]:
-            # triangulate and make faces
-            rawdata = shape.tessellate(self.config["tessellation"])
-            for v in rawdata[0]:
-                func_data["verts"].append([v.x, v.y, v.z])
-            for f in rawdata[1]:
-                func_data["faces"].append(f)
-            for face in shape.Faces:
-                for e in face.Edges:
-                    faceedges.append(e.hashCode())
-        else:
-            # write FreeCAD faces as polygons when possible
-            for face in shape.Faces:
-                self.convert_face_to_polygon(func_data, face, faceedges)
-
+    @profiler.traced
     def create_mesh_from_shape(self, func_data):
         """Create mesh from shape."""
         # print(func_data["pre_line"] + "create_mesh_from_shape")
-        # a placeholder to store edges that belong to a face
-        faceedges = []
-        shape = func_data["obj"].Shape
-        # func_data["freecad_mesh_hash"] = shape.hashCode()
-        # hashCode changes on every file opening :-(
-        if self.config["placement"]:
-            shape = func_data["obj"].Shape.copy()
-            shape.Placement = (
-                func_data["obj"].Placement.inverse().multiply(shape.Placement)
+        obj = func_data["obj"]
+        cache_key = None
+        if self.tessellation_cache:
+            cache_key = self.get_shape_key(obj)
+            func_data["freecad_mesh_hash"] = self.get_mesh_fingerprint(obj)
+            mesh_data = self.tessellation_cache.get(cache_key)
+            if mesh_data is not None:
+                func_data["mesh_data"] = mesh_data
+                return None
+        shape = None
+        # the workers only tessellate objects of the main document.
+        if obj.Document is self.doc and obj.Name in self.worker_mesh_data:
+            # already tessellated by the worker processes
+            func_data["mesh_data"] = self.worker_mesh_data[obj.Name]
+        else:
+            shape = tessellate.create_mesh_from_shape(
+                func_data["mesh_data"], obj, self.config
             )
-        if shape.Faces:
-            self.handle_shape_faces(func_data, shape, faceedges)
-        # Treat remaining edges (that are not in faces)
-        for edge in shape.Edges:
-            if not (edge.hashCode() in faceedges):
-                self.handle_shape_edge(func_data, edge)
+        if cache_key:
+            self.tessellation_cache.put(cache_key, func_data["mesh_data"])
         return shape
 
+    def check_obj_mesh_unchanged(self, obj):
+        """Check if the existing blender mesh of obj is up to date (before import)."""
+        # check_mesh_unchanged only needs the obj (no mesh buffers).
+        return self.check_mesh_unchanged({"obj": obj})
+
+    @profiler.traced
+    def check_mesh_unchanged(self, func_data):
+        """Check if the existing blender mesh can be used without tessellation."""
+        mesh_label = self.get_obj_label(func_data["obj"])
+        mesh_exists = mesh_label in self.data_index.meshes
+        if mesh_exists and mesh_label in self.imported_obj_names:
+            # already imported in this run - the mesh is reused.
+            return True
+        if not self.config["update_only_modified_meshes"]:
+            return False
+        # the archive CRCs are cheap - try them first.
+        # (only the main document is scanned - linked documents can reuse its names)
+        if self.archive_scan and func_data["obj"].Document is self.doc:
+            shape_crc = self.archive_scan.get_object_signature(func_data["obj"].Name)
+            func_data["freecad_shape_crc"] = shape_crc
+            if (
+                shape_crc
+                and mesh_exists
+                and self.config["update"]
+                and self.data_index.meshes[mesh_label].get("freecad_shape_crc", None)
+                == shape_crc
+            ):
+                return True
+        if not (mesh_exists and self.config["update"]):
+            # the BREP fingerprint is expensive - new meshes only store
+            # the archive CRCs (or the fingerprint of a tessellation cache lookup).
+            return False
+        # store the fingerprint with the updated mesh - so the next update can compare.
+        fingerprint = self.get_mesh_fingerprint(func_data["obj"])
+        func_data["freecad_mesh_hash"] = fingerprint
+        bmesh = self.data_index.meshes[mesh_label]
+        return bmesh.get("freecad_mesh_hash", None) == fingerprint
+
+    @profiler.traced
     def handle__PartFeature(self, func_data):
         """Handle Part::Feature objects."""
         pre_line_orig = func_data["pre_line"]
         pre_line = func_data["pre_line"]
-        print(func_data["pre_line"] + "handle__PartFeature")
+        log.debug("{}handle__PartFeature", func_data["pre_line"])
         pre_line += "> "
         func_data["pre_line"] = pre_line
 
@@ -1783,13 +1967,13 @@ class ImportFcstd(object):
         if self.config["links_as_collectioninstance"]:
             if (
                 obj_label in self.link_targets.children
-                and obj_label in bpy.data.objects
+                and obj_label in self.data_index.objects
             ):
                 # print(
                 #     pre_line + "found link target object '{}'"
                 #     "".format(obj_label)
                 # )
-                bobj_link_target = bpy.data.objects[obj_label]
+                bobj_link_target = self.data_index.objects[obj_label]
                 # bobj_link_target_label = self.fix_link_target_name(
                 self.fix_link_target_name(bobj_link_target)
                 # print(
@@ -1814,26 +1998,31 @@ class ImportFcstd(object):
                 pass
         else:
             # handle creation of linked copies
-            print(pre_line + "handle creation of linked copies..")
+            log.debug("{}handle creation of linked copies..", pre_line)
             # print(pre_line + "imported_obj_names:", self.imported_obj_names)
             if (
                 obj_label
-                in bpy.data.objects
+                in self.data_index.objects
                 # and obj_label in self.imported_obj_names
             ):
-                print(pre_line + "→ update bobj")
-                bobj = bpy.data.objects[obj_label]
+                log.debug("{}→ update bobj", pre_line)
+                bobj = self.data_index.objects[obj_label]
                 func_data["bobj"] = bobj
                 if not func_data["is_link"]:
                     update_placement = True
                 func_data["update_tree"] = True
             else:
-                print(pre_line + "→ just import it")
+                log.debug("{}→ just import it", pre_line)
                 # import_it = True
 
         # if import_it:
-        self.create_mesh_from_shape(func_data)
-        if func_data["verts"] and (func_data["faces"] or func_data["edges"]):
+        if self.check_mesh_unchanged(func_data):
+            log.debug("{}→ mesh unchanged - skip tessellation.", pre_line)
+            func_data["mesh_unchanged"] = True
+        else:
+            with self.profiler.phase("tessellation"):
+                self.create_mesh_from_shape(func_data)
+        if func_data["mesh_unchanged"] or func_data["mesh_data"].has_geometry():
             self.add_or_update_blender_obj(func_data)
             func_data["update_tree"] = True
 
@@ -1847,15 +2036,12 @@ class ImportFcstd(object):
         func_data["pre_line"] = pre_line_orig
 
     # Mesh::Feature
+    @profiler.traced
     def handle__MeshFeature(self, func_data):
         """Convert freecad mesh to blender mesh."""
-        mesh = func_data["obj"].Mesh
-        if self.config["placement"]:
-            # in meshes, this zeroes the placement
-            mesh = func_data["obj"].Mesh.copy()
-        t = mesh.Topology
-        func_data["verts"] = [[v.x, v.y, v.z] for v in t[0]]
-        func_data["faces"] = t[1]
+        tessellate.create_mesh_from_mesh(
+            func_data["mesh_data"], func_data["obj"], self.config
+        )
 
     # ##########################################
     # main object import
@@ -1865,14 +2051,14 @@ class ImportFcstd(object):
             "obj": None,
             "bobj": None,
             "obj_label": None,
-            "verts": [],
-            "edges": [],
-            "faces": [],
+            # flat vertex / edge / polygon buffers
+            # (including the face to material relationship)
+            "mesh_data": MeshData(weld_tolerance=self.config["weld_tolerance"]),
             "freecad_mesh_hash": None,
-            # face to material relationship
-            "matindex": [],
-            # to store reusable materials
-            "matdatabase": {},
+            # CRCs of the shape files in the FCStd archive
+            "freecad_shape_crc": None,
+            # existing blender mesh matches freecad_mesh_hash
+            "mesh_unchanged": False,
             # name: "Unnamed",
             "link_targets": [],
             "collection": None,
@@ -1928,7 +2114,7 @@ class ImportFcstd(object):
         # parent_bobj=None,
         pre_line="",
     ):
-        """Import Object."""
+        """Import Object (with all its sub objects) now."""
         # import some FreeCAD modules needed below.
         # After "import FreeCAD" these modules become available
         # import Part
@@ -1937,23 +2123,54 @@ class ImportFcstd(object):
         # dict for storing all data
         if not func_data:
             func_data = self.create_func_data()
+        self.import_queue.run(
+            self.import_obj_task, func_data=func_data, pre_line=pre_line
+        )
+        return func_data
+
+    def import_obj_task(self, func_data, pre_line=""):
+        """
+        Import Object.
+
+        the sub objects are scheduled as tasks -
+        the tree is updated by `import_obj_finish` after them.
+        """
         func_data["pre_line"] = pre_line
         obj = func_data["obj"]
         if obj:
+            profile_entry = self.profiler.begin_object(obj.Name, obj.TypeId)
             self._import_obj__handle_type(func_data, pre_line)
+            self.import_queue.schedule(
+                self.import_obj_finish, func_data, profile_entry
+            )
 
-            if func_data["update_tree"]:
-                self.update_tree_collections(func_data)
-                self.update_tree_parents(func_data)
-        return func_data
+    def import_obj_finish(self, func_data, profile_entry=None):
+        """Update tree of the imported object."""
+        if func_data["update_tree"]:
+            self.update_tree_collections(func_data)
+            self.update_tree_parents(func_data)
+        self.profiler.end_object(profile_entry)
 
+    @profiler.traced
     def import_doc_content(self, doc):
         """Import document content = filterd objects."""
+        self.prepare_doc_content(doc)
+        while self.import_step():
+            pass
+        self.finish_doc_content()
+
+    def prepare_doc_content(self, doc):
+        """Find root objects = the work queue for `import_step`."""
         pre_line = ""
+        with self.profiler.phase("object_graph"):
+            self.object_graph = fc_helper.ObjectGraph(doc)
         obj_list, obj_list_withHost = fc_helper.get_root_objects(
-            doc, filter_list=self.typeid_filter_list
+            doc, filter_list=self.typeid_filter_list, graph=self.object_graph
         )
-        print("-" * 21)
+        self.root_objects = obj_list
+        self.root_objects_withHost = obj_list_withHost
+        self.root_index = 0
+        log.debug("{}", "-" * 21)
 
         self.config["report"](
             {"INFO"},
@@ -1963,8 +2180,17 @@ class ImportFcstd(object):
             ),
             pre_line=pre_line,
         )
-        fc_helper.print_objects(obj_list, show_lists=True, show_list_details=True)
-        print("-" * 21)
+        # the list details (InList, OutList, ...) are expensive to format.
+        log.debug(
+            "{}",
+            b_helper.LazyStr(
+                fc_helper.format_objects,
+                obj_list,
+                show_lists=True,
+                show_list_details=True,
+            ),
+        )
+        log.debug("{}", "-" * 21)
 
         self.config["report"](
             {"INFO"},
@@ -1974,10 +2200,16 @@ class ImportFcstd(object):
             ),
             pre_line=pre_line,
         )
-        fc_helper.print_objects(
-            obj_list_withHost, show_lists=True, show_list_details=True
+        log.debug(
+            "{}",
+            b_helper.LazyStr(
+                fc_helper.format_objects,
+                obj_list_withHost,
+                show_lists=True,
+                show_list_details=True,
+            ),
         )
-        print("-" * 21)
+        log.debug("{}", "-" * 21)
         # self.config["report"](
         #     {"INFO"},
         #     ("the Hosts ARCH way is not implemented yet. so we just import them."),
@@ -1987,57 +2219,292 @@ class ImportFcstd(object):
         # fc_helper.print_objects(obj_list, show_lists=True)
         # print("-" * 21)
 
-        # │─ ┌─ └─ ├─ ╞═ ╘═╒═
-        # ║═ ╔═ ╚═ ╠═ ╟─
-        # ┃━ ┏━ ┗━ ┣━ ┠─
-        pre_line_start = pre_line + "┏━━━━ "
-        pre_line_sub = pre_line + "┣━ "
-        pre_line_follow = pre_line + "┃    "
-        pre_line_end = pre_line + "┗━━━━ "
-        self.config["report"]({"INFO"}, "Import", pre_line=pre_line_start)
-        for obj in obj_list:
-            if self.check_obj_visibility_with_skiphidden(obj):
-                self.print_obj(obj, pre_line=pre_line_sub)
-                func_data_new = self.create_func_data()
-                func_data_new["obj"] = obj
-                func_data_new["collection"] = self.fcstd_collection
-                func_data_new["parent_bobj"] = self.fcstd_empty
-                self.import_obj(
-                    func_data=func_data_new, pre_line=pre_line_follow,
+        log.debug("{}Import", ROOT_PRE_LINE_START)
+
+    def import_root_obj(self, obj):
+        """Import one root object (with all its children)."""
+        if self.check_obj_visibility_with_skiphidden(obj):
+            self.print_obj(obj, pre_line=ROOT_PRE_LINE_SUB)
+            func_data_new = self.create_func_data()
+            func_data_new["obj"] = obj
+            func_data_new["collection"] = self.fcstd_collection
+            func_data_new["parent_bobj"] = self.fcstd_empty
+            self.import_queue.schedule(
+                self.import_obj_task,
+                func_data=func_data_new,
+                pre_line=ROOT_PRE_LINE_FOLLOW,
+            )
+            if obj in self.root_objects_withHost:
+                log.debug(
+                    "{}TODO: handle Hosts [{}] of obj '{}'",
+                    ROOT_PRE_LINE_FOLLOW,
+                    obj.Hosts,
+                    obj,
                 )
-                if obj in obj_list_withHost:
-                    self.config["report"](
-                        {"INFO"},
-                        ("TODO: handle Hosts [{}] of obj '{}'").format(obj.Hosts, obj),
-                        pre_line=pre_line_follow,
-                    )
-            else:
-                self.print_obj(
-                    obj=obj,
-                    pre_line=pre_line_sub,
-                    post_line=(
-                        b_helper.colors.fg.darkgrey
-                        + "  (skipping - hidden)"
-                        + b_helper.colors.reset
-                    ),
+        else:
+            self.print_obj(
+                obj=obj,
+                pre_line=ROOT_PRE_LINE_SUB,
+                post_line=(
+                    b_helper.colors.fg.darkgrey
+                    + "  (skipping - hidden)"
+                    + b_helper.colors.reset
+                ),
+            )
+
+    def import_step(self, time_budget=None):
+        """
+        Run the next import tasks.
+
+        the tasks of a root object are queued when its turn comes.
+        with a `time_budget` (seconds) this returns
+        after the first task that exceeds the budget.
+        returns True if there are tasks or root objects left.
+        """
+        start = time.perf_counter()
+        # the time until the next call (modal timer) is not import time.
+        self.profiler.resume()
+        with self.profiler.phase("import_objects"):
+            while self.has_import_tasks():
+                if len(self.import_queue):
+                    self.import_queue.run_next()
+                else:
+                    obj = self.root_objects[self.root_index]
+                    self.root_index += 1
+                    self.import_queue.schedule(self.import_root_obj, obj)
+                if time_budget is not None:
+                    if time.perf_counter() - start >= time_budget:
+                        break
+        if self.has_import_tasks():
+            self.profiler.pause()
+            return True
+        return False
+
+    def has_import_tasks(self):
+        """Check if there are tasks or root objects left."""
+        return len(self.import_queue) > 0 or self.root_index < len(self.root_objects)
+
+    def get_progress(self):
+        """Get (imported, total) root objects."""
+        imported = self.root_index
+        if len(self.import_queue):
+            # the current root object is not finished
+            imported -= 1
+        return (imported, len(self.root_objects))
+
+    def finish_doc_content(self):
+        """Call after all root objects are imported."""
+        log.debug("{}finished.", ROOT_PRE_LINE_END)
+
+    def scan_archive(self):
+        """Pre-scan FCStd archive CRCs (only needed for updates)."""
+        self.archive_scan = None
+        if not (self.config["update"] and self.config["update_only_modified_meshes"]):
+            return
+        config_signature = fcstd_archive.get_config_signature(
+            self.config, ARCHIVE_CONFIG_KEYS
+        )
+        try:
+            self.archive_scan = fcstd_archive.ArchiveScan(
+                self.config["filename"], config_signature=config_signature
+            )
+        except Exception as e:
+            self.config["report"](
+                {"WARNING"}, "unable to pre-scan FCStd archive: {}".format(e)
+            )
+
+    def find_previous_import_collection(self):
+        """Find collection of a previous import of this file."""
+        filename = os.path.abspath(self.config["filename"])
+        for collection in bpy.data.collections:
+            if collection.get("freecad_filename", None) == filename:
+                return collection
+        return None
+
+    def check_archive_unchanged(self):
+        """Check if FCStd archive is unchanged since the last import."""
+        self.scan_archive()
+        if not self.archive_scan:
+            return False
+        collection = self.find_previous_import_collection()
+        return collection is not None and (
+            collection.get("freecad_archive_signature", None)
+            == self.archive_scan.signature
+        )
+
+    def store_archive_signature(self):
+        """Store FCStd archive signature for the next update."""
+        if self.archive_scan and self.fcstd_collection:
+            self.fcstd_collection["freecad_filename"] = os.path.abspath(
+                self.config["filename"]
+            )
+            self.fcstd_collection["freecad_archive_signature"] = (
+                self.archive_scan.signature
+            )
+
+    def prepare_tessellation_cache(self):
+        """Open persistent tessellation cache if configured."""
+        self.shape_keys = {}
+        if self.config["cache_dir"] and not self.tessellation_cache:
+            cache_dir = bpy.path.abspath(self.config["cache_dir"])
+            try:
+                self.tessellation_cache = tesscache.TessellationCache(
+                    cache_dir, max_size=self.config["cache_max_size"] * 1024 * 1024
                 )
-        self.config["report"]({"INFO"}, "finished.", pre_line=pre_line_end)
+            except OSError as e:
+                self.config["report"](
+                    {"WARNING"},
+                    "tessellation cache disabled. '{}': {}".format(cache_dir, e),
+                )
+
+    def close_tessellation_cache(self):
+        """Release tessellation cache files and evict old entries."""
+        if self.tessellation_cache:
+            hits = self.tessellation_cache.hits
+            misses = self.tessellation_cache.misses
+            removed = self.tessellation_cache.close()
+            self.config["report"](
+                {"INFO"},
+                "tessellation cache: {} hits, {} misses, {} entries evicted."
+                "".format(hits, misses, removed),
+            )
+            self.tessellation_cache.hits = 0
+            self.tessellation_cache.misses = 0
+
+    def get_shape_key(self, obj):
+        """
+        Get (memorized) reproducible key of the obj shape and tessellation options.
+
+        based on the BREP content -
+        `shape.hashCode()` changes on every file opening.
+        """
+        # linked documents can contain objects with the same name.
+        obj_key = fc_helper.get_object_key(obj)
+        shape_key = self.shape_keys.get(obj_key)
+        if shape_key is None:
+            shape_key = tesscache.get_cache_key(obj, self.config)
+            self.shape_keys[obj_key] = shape_key
+        return shape_key
+
+    def get_mesh_fingerprint(self, obj):
+        """Get reproducible fingerprint of the blender mesh created for obj."""
+        # the import scale is applied to the mesh vertices.
+        return "{}:{}".format(self.get_shape_key(obj), self.config["scale"])
+
+    def get_imported_objects(self):
+        """Get the objects reachable from the visible root objects."""
+        return fc_helper.get_reachable_objects(
+            self.root_objects,
+            self.object_graph,
+            self.check_obj_visibility_with_skiphidden,
+        )
+
+    def discard_unused_worker_results(self):
+        """
+        Drop the file worker results the import does not use.
+
+        the file workers run before the document is open in blender -
+        so they do not know the tessellation cache hits and unchanged meshes.
+        (the results of the other workers are all used.)
+        """
+        for name in self.worker_mesh_data.names():
+            obj = self.doc.getObject(name)
+            if (
+                obj is None
+                or (
+                    self.tessellation_cache
+                    and self.get_shape_key(obj) in self.tessellation_cache
+                )
+                or self.check_obj_mesh_unchanged(obj)
+            ):
+                self.worker_mesh_data.discard(name)
+
+    def start_workers(self, doc):
+        """
+        Start tessellating the shapes of the imported objects in worker processes.
+
+        the workers run while blender waits -
+        `collect_workers` (or `workers_running`) checks for their results.
+        """
+        self.worker_jobs = self.file_workers.pop(self.config["filename"], None)
+        if self.worker_jobs:
+            # started by the batch import
+            self.config["report"](
+                {"INFO"}, "wait for the tessellation worker of this file..",
+            )
+            return
+        if not self.config["use_workers"]:
+            return
+        object_names = []
+        for obj in self.get_imported_objects():
+            if (
+                # the workers open only the main document
+                obj.Document is doc
+                and obj.isDerivedFrom("Part::Feature")
+                and obj.TypeId not in self.typeid_filter_list
+                # arrays are imported element by element
+                and not hasattr(obj, "ElementList")
+            ):
+                if (
+                    self.tessellation_cache
+                    and self.get_shape_key(obj) in self.tessellation_cache
+                ):
+                    continue
+                if self.check_obj_mesh_unchanged(obj):
+                    continue
+                object_names.append(obj.Name)
+        if not object_names:
+            return
+        self.config["report"](
+            {"INFO"},
+            "tessellate {} objects in worker processes..".format(len(object_names)),
+        )
+        self.worker_jobs = workerpool.start_tessellation(
+            filename=self.config["filename"],
+            object_names=object_names,
+            config=self.config,
+            worker_count=self.config["worker_count"],
+            path_to_freecad=self.path_to_freecad,
+            path_to_system_packages=self.path_to_system_packages,
+            recompute=self.config["recompute"],
+        )
+
+    def workers_running(self):
+        """Check if the workers of this file are still tessellating."""
+        return self.worker_jobs is not None and not self.worker_jobs.is_done()
+
+    def collect_workers(self):
+        """Wait for the workers of this file and map their results."""
+        if self.worker_jobs is None:
+            return
+        worker_jobs = self.worker_jobs
+        self.worker_jobs = None
+        self.worker_mesh_data = worker_jobs.collect(self.config["report"])
+        # file workers run before the document is open in blender.
+        self.discard_unused_worker_results()
+        self.fill_file_workers()
+        self.config["report"](
+            {"INFO"},
+            "worker processes tessellated {} objects.".format(
+                len(self.worker_mesh_data)
+            ),
+        )
 
     def prepare_collection(self):
         """Prepare main import collection."""
         link_targets_label = self.doc.Name + "__link_targets"
         if self.config["update"]:
-            if self.doc_filename in bpy.data.collections:
-                self.fcstd_collection = bpy.data.collections[self.doc_filename]
-            if link_targets_label in bpy.data.collections:
-                self.link_targets = bpy.data.collections[link_targets_label]
+            if self.doc_filename in self.data_index.collections:
+                self.fcstd_collection = self.data_index.collections[self.doc_filename]
+            if link_targets_label in self.data_index.collections:
+                self.link_targets = self.data_index.collections[link_targets_label]
 
         if not self.fcstd_collection:
-            self.fcstd_collection = bpy.data.collections.new(self.doc_filename)
+            self.fcstd_collection = self.data_index.collections.new(self.doc_filename)
             bpy.context.scene.collection.children.link(self.fcstd_collection)
 
         if not self.link_targets:
-            self.link_targets = bpy.data.collections.new(link_targets_label)
+            self.link_targets = self.data_index.collections.new(link_targets_label)
             self.fcstd_collection.children.link(self.link_targets)
             # hide this internal object.
             # we use only the instances..
@@ -2064,11 +2531,11 @@ class ImportFcstd(object):
     def append_path(self, path, sub=""):
         if path and sub:
             path = os.path.join(path, sub)
-            print("full path:", path)
+            log.debug("full path: {}", path)
         if path and os.path.exists(path):
             if os.path.isfile(path):
                 path = os.path.dirname(path)
-            print("configured path:", path)
+            log.debug("configured path: {}", path)
             if path not in sys.path:
                 sys.path.append(path)
         else:
@@ -2146,43 +2613,47 @@ class ImportFcstd(object):
         if not self.config["auto_smooth_use"]:
             return
             
-        print("Applying auto smooth to imported objects...")
+        log.info("Applying auto smooth to imported objects...")
         
         try:
             # Apply auto smooth to all imported mesh objects
             mesh_count = 0
             for obj_name in self.imported_obj_names:
-                if obj_name in bpy.data.objects:
-                    obj = bpy.data.objects[obj_name]
+                if obj_name in self.data_index.objects:
+                    obj = self.data_index.objects[obj_name]
                     if obj.type == 'MESH' and hasattr(obj.data, "use_auto_smooth"):
                         # Enable auto smooth (this is the "shade auto smooth" functionality)
                         obj.data.use_auto_smooth = True
                         obj.data.auto_smooth_angle = self.config["auto_smooth_angle"]
                         mesh_count += 1
                 
-            print(f"Auto smooth applied to {mesh_count} mesh objects with angle {math.degrees(self.config['auto_smooth_angle'])}°")
+            log.info(
+                "Auto smooth applied to {} mesh objects with angle {}°",
+                mesh_count,
+                math.degrees(self.config["auto_smooth_angle"]),
+            )
                 
         except Exception as e:
-            print(f"Error during auto smooth application: {e}")
+            log.error("Error during auto smooth application: {}", e)
 
     def cleanup_meshes(self):
         """Clean up imported meshes using Blender's built-in operators."""
         if not self.config["cleanup_after_import"]:
             return
             
-        print("Cleaning up imported meshes...")
+        log.info("Cleaning up imported meshes...")
         
         try:
             # Select all imported mesh objects
             mesh_objects = []
             for obj_name in self.imported_obj_names:
-                if obj_name in bpy.data.objects:
-                    obj = bpy.data.objects[obj_name]
+                if obj_name in self.data_index.objects:
+                    obj = self.data_index.objects[obj_name]
                     if obj.type == 'MESH':
                         mesh_objects.append(obj)
             
             if not mesh_objects:
-                print("No mesh objects found to clean up.")
+                log.info("No mesh objects found to clean up.")
                 return
             
             # Deselect all objects first
@@ -2203,20 +2674,20 @@ class ImportFcstd(object):
             bpy.ops.mesh.select_all(action='SELECT')
             
             # Apply Tris to Quads
-            print("Applying Tris to Quads...")
+            log.info("Applying Tris to Quads...")
             bpy.ops.mesh.tris_convert_to_quads()
             
             # Apply Limited Dissolve
-            print("Applying Limited Dissolve...")
+            log.info("Applying Limited Dissolve...")
             bpy.ops.mesh.dissolve_limited()
             
             # Return to object mode
             bpy.ops.object.mode_set(mode='OBJECT')
             
-            print(f"Cleanup completed on {len(mesh_objects)} mesh objects")
+            log.info("Cleanup completed on {} mesh objects", len(mesh_objects))
                 
         except Exception as e:
-            print(f"Error during mesh cleanup: {e}")
+            log.error("Error during mesh cleanup: {}", e)
             # Make sure we return to object mode if there was an error
             try:
                 bpy.ops.object.mode_set(mode='OBJECT')
@@ -2226,15 +2697,95 @@ class ImportFcstd(object):
             # Deselect all objects
             bpy.ops.object.select_all(action='DESELECT')
 
+    def get_data_counts(self):
+        """Get number of blender data blocks (to count the created ones)."""
+        return {
+            "meshes": len(bpy.data.meshes),
+            "materials": len(bpy.data.materials),
+            "objects": len(bpy.data.objects),
+            "collections": len(bpy.data.collections),
+        }
+
+    def get_profile_path(self, suffix="_import_profile.json"):
+        """Get path of the profile JSON file - next to the .blend (if saved)."""
+        base_dir = os.path.dirname(bpy.data.filepath)
+        if not base_dir:
+            base_dir = os.path.dirname(os.path.abspath(self.config["filename"]))
+        name = os.path.splitext(os.path.basename(self.config["filename"]))[0]
+        return os.path.join(base_dir, name + suffix)
+
+    def report_profile(self, counts_before):
+        """Report profile summary and write it (and the trace) as JSON files."""
+        if not (self.profiler.enabled or self.profiler.trace):
+            return
+        self.profiler.finish()
+        try:
+            if self.profiler.enabled:
+                for name, count in self.get_data_counts().items():
+                    self.profiler.count(name, count - counts_before[name])
+                self.config["report"](
+                    {"INFO"}, "\n".join(self.profiler.format_summary())
+                )
+                path = self.profiler.write_json(self.get_profile_path())
+                self.config["report"](
+                    {"INFO"}, "import profile written to '{}'".format(path)
+                )
+            if self.profiler.trace:
+                path = self.profiler.write_trace(
+                    self.get_profile_path("_import_trace.json")
+                )
+                self.config["report"](
+                    {"INFO"}, "import trace written to '{}'".format(path)
+                )
+        except OSError as e:
+            self.config["report"](
+                {"WARNING"}, "unable to write import profile: {}".format(e)
+            )
+
+    def start_logging(self):
+        """Set log level and add batched console output."""
+        log.setLevel(b_helper.VERBOSITY_LEVELS[self.config["verbosity"]])
+        log_handler = b_helper.ConsoleLogHandler()
+        log.logger.addHandler(log_handler)
+        log.debug("config {}", self.config)
+        return log_handler
+
+    def stop_logging(self):
+        """Write remaining log messages and remove console output."""
+        if self.log_handler:
+            log.logger.removeHandler(self.log_handler)
+            self.log_handler.close()
+            self.log_handler = None
+
     def import_fcstd(self, filename=None):
         """Read a FreeCAD .FCStd file and creates Blender objects."""
-        if filename:
-            self.config["filename"] = filename
+        result = self.import_begin(filename)
+        if result:
+            return result
+        cancelled = True
+        try:
+            while self.import_step():
+                pass
+            cancelled = False
+        except Exception as e:
+            self.config["report"]({"ERROR"}, str(e))
+            raise e
+        finally:
+            result = self.import_end(cancelled=cancelled)
+        return result
 
+    def load_freecad(self):
+        """
+        Import FreeCAD and the additional modules (only once per importer).
+
+        returns None on success - otherwise the operator result.
+        """
+        if self.freecad_loaded:
+            return None
         try:
             self.prepare_freecad_path()
             self.prepare_freecad_import()
-            import FreeCAD
+            import FreeCAD  # noqa
         except ModuleNotFoundError as e:
             self.config["report"](
                 {"ERROR"},
@@ -2254,67 +2805,280 @@ class ImportFcstd(object):
         finally:
             self.cleanup_freecad_import()
 
-        self.import_extras()
+        result = self.import_extras()
+        if result:
+            return result
+        self.freecad_loaded = True
+        return None
 
-        self.guidata = guidata.load_guidata(
-            self.config["filename"], self.config["report"],
+    def reset_file_state(self):
+        """Reset the per file state (batch import reuses the importer)."""
+        self.doc = None
+        self.doc_filename = None
+        self.guidata = {}
+        self.fcstd_collection = None
+        self.link_targets = None
+        self.fcstd_empty = None
+        self.imported_obj_names = set()
+        self.shape_keys = {}
+        self.archive_scan = None
+        self.root_objects = []
+        self.root_objects_withHost = []
+        self.root_index = 0
+        self.object_graph = None
+        self.import_queue.clear()
+
+    def finish_file(self, result):
+        """Store file timing and stop logging."""
+        self.file_timings.append(
+            (
+                self.config["filename"],
+                time.perf_counter() - self.file_start_time,
+                result,
+            )
+        )
+        self.stop_logging()
+        return result
+
+    def import_files(self, filenames):
+        """
+        Import multiple files (batch mode).
+
+        FreeCAD is loaded once and the material cache is shared.
+        with `concurrent_files` the following files are tessellated
+        in worker processes while the current file is imported.
+        """
+        self.file_timings = []
+        self.prepare_data_index()
+        if self.config["concurrent_files"]:
+            # the first file uses the normal worker setup.
+            self.start_file_workers(filenames[1:])
+        try:
+            for filename in filenames:
+                self.import_fcstd(filename)
+        finally:
+            self.cancel_file_workers()
+        self.report_file_timings()
+        if any(result == {"FINISHED"} for _, _, result in self.file_timings):
+            return {"FINISHED"}
+        return {"CANCELLED"}
+
+    def prepare_data_index(self):
+        """Index the blender data (once for all files of a batch import)."""
+        with self.profiler.phase("data_index"):
+            self.data_index = dataindex.DataIndex()
+
+    def start_file_workers(self, filenames):
+        """Queue files for the tessellation workers - one worker per file."""
+        self.file_worker_queue = list(filenames)
+        self.fill_file_workers()
+
+    def fill_file_workers(self):
+        """Start workers for the queued files (up to worker_count at the same time)."""
+        max_running = workerpool.get_worker_count(
+            self.config["worker_count"], len(self.file_worker_queue) + len(self.file_workers)
         )
+        while self.file_worker_queue and len(self.file_workers) < max_running:
+            filename = self.file_worker_queue.pop(0)
+            self.file_workers[filename] = workerpool.start_tessellation(
+                filename=filename,
+                object_names=None,
+                config=self.config,
+                worker_count=1,
+                path_to_freecad=self.path_to_freecad,
+                path_to_system_packages=self.path_to_system_packages,
+                recompute=self.config["recompute"],
+                typeid_filter_list=self.typeid_filter_list,
+                skiphidden=self.config["skiphidden"],
+            )
+
+    def cancel_file_workers(self, filename=None):
+        """Stop the workers of filename (or all files)."""
+        if filename is None:
+            self.file_worker_queue = []
+            filenames = list(self.file_workers.keys())
+        else:
+            if filename in self.file_worker_queue:
+                self.file_worker_queue.remove(filename)
+            filenames = [filename] if filename in self.file_workers else []
+        for name in filenames:
+            self.file_workers.pop(name).cancel()
+        self.fill_file_workers()
+
+    def report_file_timings(self):
+        """Report import time per file."""
+        if len(self.file_timings) <= 1:
+            return
+        total = sum(duration for _, duration, _ in self.file_timings)
+        lines = ["imported {} files in {:.2f}s:".format(len(self.file_timings), total)]
+        for filename, duration, result in self.file_timings:
+            lines.append(
+                "  {:>8.2f}s  {:<9} {}".format(
+                    duration, "/".join(sorted(result)), os.path.basename(filename)
+                )
+            )
+        self.config["report"]({"INFO"}, "\n".join(lines))
+
+    def import_begin(self, filename=None, wait_for_workers=True):
+        """
+        Open the FreeCAD document and prepare the import.
+
+        returns None if the root objects are ready for `import_step` -
+        otherwise the operator result ({"FINISHED"} / {"CANCELLED"})
+        as there is nothing (more) to do.
+        without `wait_for_workers` the tessellation workers keep running -
+        call `import_prepare` when `workers_running` returns False.
+        """
+        if filename:
+            self.config["filename"] = filename
+        self.file_start_time = time.perf_counter()
+        self.log_handler = self.start_logging()
+        self.profiler.reset()
+        self.counts_before = self.get_data_counts()
+        self.reset_file_state()
+
+        with self.profiler.phase("archive_scan"):
+            archive_unchanged = self.check_archive_unchanged()
+        if archive_unchanged:
+            self.config["report"](
+                {"INFO"},
+                "'{}' unchanged since last import - nothing to do."
+                "".format(self.config["filename"]),
+            )
+            self.cancel_file_workers(self.config["filename"])
+            return self.finish_file({"FINISHED"})
+
+        result = self.load_freecad()
+        if result:
+            return self.finish_file(result)
+        import FreeCAD
+
+        with self.profiler.phase("guidata"):
+            self.guidata = guidata.load_guidata(
+                self.config["filename"], self.config["report"],
+            )
+        if self.matdatabase is None:
+            self.matdatabase = material.create_matdatabase()
 
         # Context Managers not implemented..
         # see https://docs.python.org/3.8/reference/compound_stmts.html#with
         # with FreeCAD.open(self.config["filename"]) as doc:
-        # so we use the classic try finally block:
+        # so the document is closed in `import_end`.
+        # doc = FreeCAD.open(
+        #     "/home/stefan/mydata/freecad/tests/linking_test/Linking.FCStd")
+        self.config["report"](
+            {"INFO"}, "open FreeCAD file. '{}'" "".format(self.config["filename"])
+        )
+        doc = None
         try:
-            # doc = FreeCAD.open(
-            #     "/home/stefan/mydata/freecad/tests/linking_test/Linking.FCStd")
+            with self.profiler.phase("freecad_open"):
+                doc = FreeCAD.open(self.config["filename"])
+        except Exception as e:
+            log.error("{}", e)
+        if not doc:
             self.config["report"](
-                {"INFO"}, "open FreeCAD file. '{}'" "".format(self.config["filename"])
+                {"ERROR"},
+                "Unable to open the given FreeCAD file '{}'"
+                "".format(self.config["filename"]),
             )
-            try:
-                doc = FreeCAD.open(self.config["filename"])
-            except Exception as e:
-                print(e)
-            docname = doc.Name
-            if doc:
-                self.doc_filename = doc.Name + ".FCStd"
-                self.config["report"](
-                    {"INFO"},
-                    "File '{}' successfully opened." "".format(self.doc_filename),
-                )
-                self.doc = doc
-                # self.print_debug_report()
-                self.config["report"]({"INFO"}, "recompute..")
-                self.doc.recompute()
-                # self.config["report"]({'INFO'}, "importLinks..")
-                # self.doc.importLinks()
-                # importLinks is currently not reliable..
-                # self.config["report"]({'INFO'}, "recompute..")
-                # self.doc.recompute()
-                self.prepare_collection()
-                self.prepare_root_empty()
-                self.import_doc_content(doc)
-            else:
-                self.config["report"](
-                    {"ERROR"},
-                    "Unable to open the given FreeCAD file '{}'"
-                    "".format(self.config["filename"]),
+            self.cancel_file_workers(self.config["filename"])
+            return self.finish_file({"CANCELLED"})
+
+        self.doc_filename = doc.Name + ".FCStd"
+        self.config["report"](
+            {"INFO"}, "File '{}' successfully opened." "".format(self.doc_filename),
+        )
+        self.doc = doc
+        try:
+            self.config["report"](
+                {"INFO"}, "recompute ({})..".format(self.config["recompute"])
+            )
+            with self.profiler.phase("recompute"):
+                recomputed = fc_helper.recompute_document(
+                    self.doc, self.config["recompute"]
                 )
-                return {"CANCELLED"}
+            self.config["report"]({"INFO"}, "recomputed {} objects.".format(recomputed))
+            self.prepare_tessellation_cache()
+            # the workers only tessellate objects reachable from the root objects
+            # that have no up to date mesh.
+            self.prepare_doc_content(doc)
+            if self.data_index is None:
+                self.prepare_data_index()
+            with self.profiler.phase("workers"):
+                self.start_workers(doc)
+            # self.config["report"]({'INFO'}, "importLinks..")
+            # self.doc.importLinks()
+            # importLinks is currently not reliable..
+            # self.config["report"]({'INFO'}, "recompute..")
+            # self.doc.recompute()
         except Exception as e:
             self.config["report"]({"ERROR"}, str(e))
+            self.import_end(cancelled=True)
             raise e
+        if wait_for_workers:
+            self.import_prepare()
+        return None
+
+    def import_prepare(self):
+        """Collect the worker results and prepare the blender collections."""
+        try:
+            with self.profiler.phase("workers"):
+                self.collect_workers()
+            self.prepare_collection()
+            self.prepare_root_empty()
+        except Exception as e:
+            self.config["report"]({"ERROR"}, str(e))
+            self.import_end(cancelled=True)
+            raise e
+
+    def import_end(self, cancelled=False):
+        """
+        Close the FreeCAD document and finish the import.
+
+        if `cancelled` the already imported root objects are kept -
+        but the archive signature is not stored.
+        so the next update imports the file again.
+        """
+        self.profiler.resume()
+        try:
+            if self.doc and not cancelled:
+                self.finish_doc_content()
+                self.store_archive_signature()
         finally:
-            FreeCAD.closeDocument(docname)
-        
+            if self.doc:
+                import FreeCAD
+
+                FreeCAD.closeDocument(self.doc.Name)
+                self.doc = None
+            if self.worker_jobs is not None:
+                # cancelled while the workers were running
+                self.worker_jobs.cancel()
+                self.worker_jobs = None
+            # the blender meshes have their own copy of the data now.
+            self.worker_mesh_data.close()
+            self.close_tessellation_cache()
+
         # Apply auto smooth if requested
-        self.apply_auto_smooth()
-        
+        with self.profiler.phase("auto_smooth"):
+            self.apply_auto_smooth()
+
         # Clean up meshes
-        self.cleanup_meshes()
-        
-        print("Import finished.")
-        return {"FINISHED"}
+        with self.profiler.phase("cleanup"):
+            self.cleanup_meshes()
 
+        self.report_profile(self.counts_before)
+        if cancelled:
+            imported, total = self.get_progress()
+            self.config["report"](
+                {"WARNING"},
+                "Import cancelled after {} of {} root objects."
+                "".format(imported, total),
+            )
+            result = {"CANCELLED"}
+        else:
+            log.info("Import finished.")
+            result = {"FINISHED"}
+        return self.finish_file(result)
 
 def main_test():
     """Tests."""
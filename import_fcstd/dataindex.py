@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Name indexes of the blender data.
+
+`name in bpy.data.objects` and `bpy.data.objects[name]` search the
+whole list - in scenes with many objects these lookups dominate an update import.
+the indexes are filled once per import and kept up to date by the importer
+for every datablock it creates, renames or removes.
+"""
+
+import bpy
+
+
+class NameIndex(object):
+    """
+    name → datablock index of one bpy.data collection.
+
+    entries renamed or removed by others are detected on access.
+    datablocks created by others during the import are not found.
+    """
+
+    def __init__(self, data):
+        """Index all datablocks of data (for example `bpy.data.objects`)."""
+        self.data = data
+        self.items = {item.name: item for item in data}
+
+    def __len__(self):
+        """Number of indexed datablocks."""
+        return len(self.items)
+
+    def __contains__(self, name):
+        """Check if a datablock with name exists."""
+        return self.get(name) is not None
+
+    def __getitem__(self, name):
+        """Get datablock by name."""
+        item = self.get(name)
+        if item is None:
+            raise KeyError(name)
+        return item
+
+    def get(self, name, default=None):
+        """Get datablock by name - or default."""
+        item = self.items.get(name, None)
+        if item is None:
+            return default
+        try:
+            if item.name == name:
+                return item
+        except ReferenceError:
+            # removed
+            pass
+        # renamed or removed - check the real data.
+        del self.items[name]
+        item = self.data.get(name, None)
+        if item is None:
+            return default
+        self.items[name] = item
+        return item
+
+    def add(self, item):
+        """Add datablock (with its final name)."""
+        self.items[item.name] = item
+        return item
+
+    def new(self, *args, **kwargs):
+        """Create new datablock and add it."""
+        return self.add(self.data.new(*args, **kwargs))
+
+    def rename(self, item, name):
+        """Rename datablock."""
+        self.items.pop(item.name, None)
+        item.name = name
+        # blender adds a number suffix if the name is taken
+        return self.add(item).name
+
+    def remove(self, item):
+        """Remove datablock."""
+        self.items.pop(item.name, None)
+        self.data.remove(item)
+
+
+class DataIndex(object):
+    """Name indexes for the objects, meshes and collections."""
+
+    def __init__(self):
+        """Index the current blender data."""
+        self.objects = NameIndex(bpy.data.objects)
+        self.meshes = NameIndex(bpy.data.meshes)
+        self.collections = NameIndex(bpy.data.collections)
+
+
+def get_users_collections(bobj):
+    """Get the collections (not the scene master collections) bobj is linked to."""
+    return [
+        collection
+        for collection in bobj.users_collection
+        if not collection.is_embedded_data
+    ]
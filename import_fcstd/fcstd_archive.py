@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Change detection for FCStd archives without FreeCAD.
+
+the FCStd file is a zip archive.
+its central directory has a CRC32 for every entry -
+so we can detect changed shapes (`PartShape*.brp`, `*.bms`)
+without decompressing them or opening the document in FreeCAD.
+`Document.xml` maps the objects to their shape files.
+"""
+
+import hashlib
+import json
+import xml.sax
+import zipfile
+
+
+class FreeCAD_document_xml_handler(xml.sax.ContentHandler):
+    """
+    A XML handler to process the FreeCAD Document.xml.
+
+    this creates a dictionary where each key is a FC object name,
+    and each value is the list of files referenced by its properties.
+    """
+
+    def __init__(self):
+        """Init."""
+        self.object_files = {}
+        self.in_object_data = False
+        self.current = None
+
+    def startElement(self, tag, attributes):
+        """Call when an element starts."""
+        if tag == "ObjectData":
+            self.in_object_data = True
+        elif self.in_object_data and tag == "Object" and self.current is None:
+            self.current = attributes.get("name", None)
+            if self.current:
+                self.object_files.setdefault(self.current, [])
+        elif self.current and "file" in attributes:
+            file_name = attributes["file"]
+            if file_name:
+                self.object_files[self.current].append(file_name)
+
+    def endElement(self, tag):
+        """Call when an elements ends."""
+        if tag == "ObjectData":
+            self.in_object_data = False
+        elif tag == "Object" and self.in_object_data:
+            self.current = None
+
+
+def get_config_signature(config, keys):
+    """Get signature of import options."""
+    data = {key: config[key] for key in keys}
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ArchiveScan(object):
+    """Result of scanning a FCStd archive."""
+
+    def __init__(self, filename, config_signature=""):
+        """Scan archive."""
+        self.filename = filename
+        self.config_signature = config_signature
+        self.crcs = {}
+        self.object_files = {}
+        with zipfile.ZipFile(filename) as zdoc:
+            for info in zdoc.infolist():
+                self.crcs[info.filename] = (info.CRC, info.file_size)
+            if "Document.xml" in self.crcs:
+                handler = FreeCAD_document_xml_handler()
+                xml.sax.parseString(zdoc.read("Document.xml"), handler)
+                self.object_files = handler.object_files
+        self.signature = self.get_signature(sorted(self.crcs.items()))
+
+    def get_signature(self, items):
+        """Get signature for list of (file name, (crc, size)) items."""
+        data = json.dumps([self.config_signature, items])
+        return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+    def get_object_signature(self, obj_name):
+        """
+        Get signature of the shape / mesh files of an object.
+
+        returns None if the object has no files in the archive.
+        """
+        files = self.object_files.get(obj_name, None)
+        if not files:
+            return None
+        items = []
+        for file_name in files:
+            if file_name not in self.crcs:
+                return None
+            items.append((file_name, self.crcs[file_name]))
+        return self.get_signature(items)
@@ -7,14 +7,14 @@ import bpy
 
 
 def rename_old_data(data, data_label):
-    """Recusive add '_old' to data object."""
+    """Recusive add '_old' to data object (data is a `dataindex.NameIndex`)."""
     name_old = None
     if data_label in data:
         name_old = data[data_label].name + "_old"
         if name_old in data:
             # rename recusive..
             rename_old_data(data, name_old)
-        data[data_label].name = name_old
+        data.rename(data[data_label], name_old)
     return name_old
 
 
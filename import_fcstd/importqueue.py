@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Work queue of import tasks.
+
+the object tree is walked without recursion:
+a handler schedules the import of the sub objects (and the work to do
+after them) as tasks instead of calling `import_obj` directly.
+so deep link chains do not hit the python recursion limit
+and the import can be stopped and continued between any two tasks.
+"""
+
+
+class ImportQueue(object):
+    """
+    Depth first work queue.
+
+    a task is a callable with its arguments.
+    tasks scheduled while a task runs are executed directly after it
+    (in the order they were scheduled) -
+    before the tasks that were already waiting.
+    this way the execution order is the same as with recursive calls.
+    """
+
+    def __init__(self):
+        """Init."""
+        # the next task is on top (the end of the list)
+        self.stack = []
+        # tasks scheduled by the running task
+        self.scheduled = None
+
+    def __len__(self):
+        """Number of waiting tasks."""
+        return len(self.stack)
+
+    def clear(self):
+        """Remove all waiting tasks."""
+        self.stack = []
+
+    def schedule(self, func, *args, **kwargs):
+        """Schedule task to run after the current task."""
+        if self.scheduled is None:
+            # not called from a task
+            self.stack.append((func, args, kwargs))
+        else:
+            self.scheduled.append((func, args, kwargs))
+
+    def run_next(self):
+        """Run the next task."""
+        func, args, kwargs = self.stack.pop()
+        outer_scheduled = self.scheduled
+        self.scheduled = []
+        try:
+            func(*args, **kwargs)
+            self.stack.extend(reversed(self.scheduled))
+        finally:
+            self.scheduled = outer_scheduled
+
+    def run(self, func, *args, **kwargs):
+        """Run task and all the tasks it schedules now."""
+        depth = len(self.stack)
+        self.stack.append((func, args, kwargs))
+        while len(self.stack) > depth:
+            self.run_next()
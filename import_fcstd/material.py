@@ -4,12 +4,36 @@
 """Material Things."""
 
 import bpy
+import numpy as np
 from bpy_extras.node_shader_utils import PrincipledBSDFWrapper
 
 from .. import blender_helper as b_helper
 
 # from . import helper
 
+# custom property used to find materials created by this importer
+RGBA_PROPERTY = "freecad_rgba"
+
+
+def get_rgba_key(rgba):
+    """Get hashable & stable material cache key for rgba value."""
+    return tuple(round(float(c), 6) for c in rgba)
+
+
+def create_matdatabase():
+    """
+    Create rgba → material cache.
+
+    seeded with all materials in bpy.data that carry the rgba fingerprint.
+    this way re-imports and multi-file imports reuse the existing materials.
+    """
+    matdatabase = {}
+    for bmat in bpy.data.materials:
+        rgba = bmat.get(RGBA_PROPERTY, None)
+        if rgba is not None and len(rgba) == 4:
+            matdatabase.setdefault(get_rgba_key(rgba), bmat)
+    return matdatabase
+
 
 class MaterialManager(object):
     """
@@ -23,6 +47,7 @@ class MaterialManager(object):
         bobj,
         obj_label,
         sharemats,
+        matdatabase=None,
         report=None,
         report_preline="",
     ):
@@ -34,6 +59,10 @@ class MaterialManager(object):
         self.bobj = bobj
         self.obj_label = obj_label
         self.sharemats = sharemats
+        # to store reusable materials (shared for the whole import)
+        if matdatabase is None:
+            matdatabase = {}
+        self.matdatabase = matdatabase
 
     def report(self, data, mode=None, pre_line=None):
         if not mode:
@@ -98,113 +127,55 @@ class MaterialManager(object):
             bmat.diffuse_color = rgba
             principled.alpha = rgba[3]
             bmat.blend_method = "BLEND"
+        bmat[RGBA_PROPERTY] = rgba
         if self.sharemats:
-            self.func_data["matdatabase"][rgba] = bmat
+            self.matdatabase[get_rgba_key(rgba)] = bmat
         return bmat
 
-    def handle_material_per_face(self, face_index, objmats, material_index):
-        """Handle material for face."""
-        # Create new mats and attribute faces to them
-        # DiffuseColor stores int values, Blender use floats
-        # self.report(
-        #     b_helper.colors.fg.lightblue
-        #     + "handle_material_per_face"
-        #     + b_helper.colors.reset,
-        #     pre_line="|  ",
-        # )
+    def handle_material_per_face(self, objmats, material_index):
+        """Get material slot index for one FreeCAD face."""
+        # Create new mats if needed and return the slot index.
+        # objmats maps rgba to the material slot of this object.
         rgba = self.get_obj_rgba(self.func_data["obj"].Name, material_index)
-        # get or create blender material
-        bmat = None
-        if self.sharemats:
-            if rgba in self.func_data["matdatabase"]:
-                bmat = self.func_data["matdatabase"][rgba]
-                if rgba not in objmats:
-                    objmats.append(rgba)
-                    self.bobj.data.materials.append(bmat)
-        if not bmat:
-            if rgba in objmats:
-                bmat = self.bobj.data.materials[objmats.index(rgba)]
-        if not bmat:
-            bmat_name = self.obj_label + "_" + str(len(objmats))
-            bmat = self.create_new_bmat(bmat_name, rgba)
-            objmats.append(rgba)
+        objmats_index = objmats.get(rgba)
+        if objmats_index is None:
+            # get or create blender material
+            bmat = None
+            if self.sharemats:
+                bmat = self.matdatabase.get(get_rgba_key(rgba))
+            if not bmat:
+                bmat_name = self.obj_label + "_" + str(len(objmats))
+                bmat = self.create_new_bmat(bmat_name, rgba)
+            objmats_index = len(self.bobj.data.materials)
+            objmats[rgba] = objmats_index
             self.bobj.data.materials.append(bmat)
-
-        # at this point we should have a valid blender material
-
-        # self.report(
-        #     b_helper.colors.fg.lightblue
-        #     + "objmats "
-        #     + b_helper.colors.reset
-        #     + "{}".format(objmats),
-        #     pre_line="|  ",
-        # )
-        # self.report(
-        #     b_helper.colors.fg.lightblue
-        #     + "bmat "
-        #     + b_helper.colors.reset
-        #     + "{}".format(bmat),
-        #     pre_line="|  ",
-        # )
-        # self.report(
-        #     b_helper.colors.fg.lightblue
-        #     + "face_index "
-        #     + b_helper.colors.reset
-        #     + "{}".format(face_index),
-        #     pre_line="|  ",
-        # )
-
-        # assigne materials to polygons
-        objmats_index = objmats.index(rgba)
-        # self.report(
-        #     b_helper.colors.fg.lightblue
-        #     + "objmats_index "
-        #     + b_helper.colors.reset
-        #     + "{}".format(objmats_index),
-        #     pre_line="|  ",
-        # )
-        # self.report(
-        #     b_helper.colors.fg.lightblue
-        #     + 'self.func_data["matindex"][material_index] '
-        #     + b_helper.colors.reset
-        #     + "{}".format(self.func_data["matindex"][material_index]),
-        #     pre_line="|  ",
-        # )
-
-        for fj in range(self.func_data["matindex"][material_index]):
-            # self.report(
-            #     b_helper.colors.fg.lightblue
-            #     + "fj "
-            #     + b_helper.colors.reset
-            #     + "{}".format(fj),
-            #     pre_line="|  * ",
-            # )
-            # self.report(
-            #     b_helper.colors.fg.lightblue
-            #     + "face_index + fj "
-            #     + b_helper.colors.reset
-            #     + "{}".format(face_index + fj),
-            #     pre_line="|  * ",
-            # )
-            self.bobj.data.polygons[face_index + fj].material_index = objmats_index
-        face_index += self.func_data["matindex"][material_index]
-        return face_index
+        return objmats_index
 
     def handle_material_multi(self):
         """Handle multi material."""
         # we have per-face materials.
-        # self.report(
-        #     b_helper.colors.fg.lightgreen
-        #     + "handle_material_multi"
-        #     + b_helper.colors.reset,
-        #     pre_line="|  ",
-        # )
-        face_index = 0
-        objmats = []
-        for material_index in range(len(self.func_data["matindex"])):
-            face_index = self.handle_material_per_face(
-                face_index, objmats, material_index
+        # every FreeCAD face is converted to `matindex[i]` polygons
+        # in the same order - so we can expand the per face slot indices
+        # to a per polygon array and assign it in one go.
+        matindex = self.func_data["mesh_data"].matindex
+        objmats = {}
+        face_slots = np.array(
+            [
+                self.handle_material_per_face(objmats, material_index)
+                for material_index in range(len(matindex))
+            ],
+            dtype=np.int32,
+        )
+        polygon_slots = np.repeat(face_slots, np.array(matindex, dtype=np.int32))
+        polygons = self.bobj.data.polygons
+        if len(polygon_slots) != len(polygons):
+            self.report(
+                "polygon count {} does not match material faces {}. "
+                "skipping material assignment.".format(len(polygons), len(polygon_slots)),
+                mode={"WARNING"},
             )
+            return
+        polygons.foreach_set("material_index", polygon_slots)
 
     def handle_material_single(self):
         """Handle single material."""
@@ -212,13 +183,14 @@ class MaterialManager(object):
         self.report(
             b_helper.colors.fg.lightgreen
             + "handle_material_single"
-            + b_helper.colors.reset
+            + b_helper.colors.reset,
+            mode={"DEBUG"},
         )
         rgba = self.get_obj_rgba(self.func_data["obj"].Name)
         bmat = None
         if self.sharemats:
-            if rgba in self.func_data["matdatabase"]:
-                bmat = self.func_data["matdatabase"][rgba]
+            if get_rgba_key(rgba) in self.matdatabase:
+                bmat = self.matdatabase[get_rgba_key(rgba)]
             else:
                 # print("not found in db:",rgba,"in",matdatabase)
                 pass
@@ -240,10 +212,10 @@ class MaterialManager(object):
             # self.report(
             #     b_helper.colors.bold
             #     + b_helper.colors.fg.lightblue
-            #     + 'self.func_data["matindex"]'
-            #     + "  ({}):  ".format(len(self.func_data["matindex"]))
+            #     + 'self.func_data["mesh_data"].matindex'
+            #     + "  ({}):  ".format(len(self.func_data["mesh_data"].matindex))
             #     + b_helper.colors.reset
-            #     + "{}".format(self.func_data["matindex"])
+            #     + "{}".format(self.func_data["mesh_data"].matindex)
             # )
             # # ############
             # # list colors:
@@ -280,10 +252,10 @@ class MaterialManager(object):
 
             # check for multi material
             if (
-                self.func_data["matindex"]
+                len(self.func_data["mesh_data"].matindex) > 0
                 and ("DiffuseColor" in self.guidata[self.func_data["obj"].Name])
                 and (
-                    len(self.func_data["matindex"])
+                    len(self.func_data["mesh_data"].matindex)
                     == len(self.guidata[self.func_data["obj"].Name]["DiffuseColor"])
                 )
             ):
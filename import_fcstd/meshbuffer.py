@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compact binary transport format for tessellated mesh buffers.
+
+the tessellation workers write one file with the flat buffers of all their objects.
+the importer maps the file into memory and uses numpy views on it -
+so the data goes to `foreach_set` without any intermediate python objects.
+
+file layout:
+    magic       4 bytes   b"FCMB"
+    version     uint32
+    index_start uint64    offset of the json index
+    data        flat arrays, every array aligned to 16 bytes
+    index       json:
+                {object name: {buffer name: [dtype, offset, count]}}
+
+buffers per object:
+    coords       float32  x, y, z per vertex
+    loops        int32    vertex index per polygon corner
+    loop_starts  int32    first loop per polygon
+    loop_totals  int32    loop count per polygon
+    edges        int32    two vertex indices per loose edge
+    matindex     int32    number of polygons per FreeCAD face
+
+writing only needs the `array` module - so the worker does not need numpy.
+"""
+
+import json
+import mmap
+import struct
+from array import array
+
+MAGIC = b"FCMB"
+VERSION = 1
+HEADER = struct.Struct("<4sIQ")
+ALIGNMENT = 16
+
+# buffer name → array typecode
+BUFFER_TYPES = (
+    ("coords", "f"),
+    ("loops", "i"),
+    ("loop_starts", "i"),
+    ("loop_totals", "i"),
+    ("edges", "i"),
+    ("matindex", "i"),
+)
+
+# array typecode → numpy dtype name
+DTYPE_NAMES = {
+    "f": "float32",
+    "i": "int32",
+}
+
+
+def write_mesh_buffers(path, mesh_data_by_name):
+    """Write flat buffers of all MeshData objects to path."""
+    index = {}
+    with open(path, "wb") as buffer_file:
+        buffer_file.write(HEADER.pack(MAGIC, VERSION, 0))
+        for name, mesh_data in mesh_data_by_name.items():
+            buffers = mesh_data.get_buffers()
+            entry = {}
+            for buffer_name, typecode in BUFFER_TYPES:
+                data = buffers[buffer_name]
+                if not (isinstance(data, array) and data.typecode == typecode):
+                    data = array(typecode, data)
+                padding = -buffer_file.tell() % ALIGNMENT
+                buffer_file.write(b"\0" * padding)
+                entry[buffer_name] = [
+                    DTYPE_NAMES[typecode],
+                    buffer_file.tell(),
+                    len(data),
+                ]
+                buffer_file.write(data.tobytes())
+            index[name] = entry
+        index_start = buffer_file.tell()
+        buffer_file.write(json.dumps(index).encode("utf-8"))
+        buffer_file.seek(0)
+        buffer_file.write(HEADER.pack(MAGIC, VERSION, index_start))
+
+
+class MeshBufferFile(object):
+    """
+    Memory mapped mesh buffer file.
+
+    `get_buffers` returns numpy views into the mapped file (no copy).
+    keep this object open as long as the views are used.
+    """
+
+    def __init__(self, path):
+        """Open and map file."""
+        self.path = path
+        self.file = open(path, "rb")
+        self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_start = HEADER.unpack_from(self.mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("'{}' is not a valid mesh buffer file.".format(path))
+        self.index = json.loads(self.mmap[index_start:].decode("utf-8"))
+
+    def names(self):
+        """Get names of all objects in file."""
+        return list(self.index.keys())
+
+    def get_buffers(self, name):
+        """Get dict of numpy views for object."""
+        import numpy as np
+
+        buffers = {}
+        for buffer_name, (dtype, offset, count) in self.index[name].items():
+            buffers[buffer_name] = np.frombuffer(
+                self.mmap, dtype=dtype, count=count, offset=offset
+            )
+        return buffers
+
+    def close(self):
+        """Close file."""
+        if self.mmap is not None:
+            try:
+                self.mmap.close()
+            except BufferError:
+                # there are still views on the data -
+                # the map is released when they are gone.
+                pass
+            self.mmap = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
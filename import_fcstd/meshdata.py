@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Mesh data containers used while converting FreeCAD shapes."""
+
+import math
+from array import array
+
+
+# offsets to the 27 cells of the spatial hash grid surrounding a vertex
+_NEIGHBOUR_CELLS = tuple(
+    (dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+)
+
+
+class VertexPool(object):
+    """
+    Deduplicate vertices while collecting them.
+
+    every coordinate gets a stable index in the flat `coords` array
+    (x, y, z per vertex).
+    the lookup is a dict keyed on the coordinate tuple -
+    so adding a vertex is O(1) instead of the O(n) `list.index()` search.
+
+    with a `tolerance` > 0 vertices closer than this distance are welded.
+    OpenCASCADE creates the vertices of shared edges for every face separately
+    and they often differ in the last digits -
+    a spatial hash grid with a cell size of `tolerance` finds these
+    by only checking the 27 surrounding cells.
+    """
+
+    def __init__(self, coords=None, tolerance=0.0):
+        """Init."""
+        if coords is None:
+            coords = array("d")
+        self.coords = coords
+        self.lookup = {}
+        self.tolerance = 0.0
+        self.tolerance_squared = 0.0
+        self.cell_size_inv = 0.0
+        self.grid = {}
+        if tolerance and tolerance > 0:
+            self.tolerance = tolerance
+            self.tolerance_squared = tolerance * tolerance
+            self.cell_size_inv = 1.0 / tolerance
+        for index in range(len(self)):
+            co = tuple(self.coords[index * 3:index * 3 + 3])
+            self.lookup.setdefault(co, index)
+            if self.tolerance:
+                self.grid.setdefault(self.get_cell(*co), []).append(index)
+
+    def __len__(self):
+        """Number of unique vertices."""
+        return len(self.coords) // 3
+
+    def get_cell(self, x, y, z):
+        """Get spatial hash grid cell for coordinate."""
+        inv = self.cell_size_inv
+        return (math.floor(x * inv), math.floor(y * inv), math.floor(z * inv))
+
+    def find_near(self, x, y, z):
+        """Find index of a vertex closer than tolerance - or None."""
+        cx, cy, cz = self.get_cell(x, y, z)
+        coords = self.coords
+        for dx, dy, dz in _NEIGHBOUR_CELLS:
+            cell = self.grid.get((cx + dx, cy + dy, cz + dz))
+            if cell:
+                for index in cell:
+                    i = index * 3
+                    distance_squared = (
+                        (coords[i] - x) ** 2
+                        + (coords[i + 1] - y) ** 2
+                        + (coords[i + 2] - z) ** 2
+                    )
+                    if distance_squared <= self.tolerance_squared:
+                        return index
+        return None
+
+    def add(self, x, y, z):
+        """Add vertex and return its index."""
+        key = (x, y, z)
+        index = self.lookup.get(key)
+        if index is None:
+            if self.tolerance:
+                index = self.find_near(x, y, z)
+            if index is None:
+                index = len(self)
+                self.coords.extend((x, y, z))
+                if self.tolerance:
+                    self.grid.setdefault(self.get_cell(x, y, z), []).append(index)
+            self.lookup[key] = index
+        return index
+
+    def add_vector(self, v):
+        """Add FreeCAD Vector (lower case x, y, z) and return its index."""
+        return self.add(v.x, v.y, v.z)
+
+    def add_vertex(self, vert):
+        """Add FreeCAD Vertex (upper case X, Y, Z) and return its index."""
+        return self.add(vert.X, vert.Y, vert.Z)
+
+
+def clean_face_indices(indices):
+    """
+    Remove repeated vertex indices from a polygon.
+
+    welding can collapse neighbouring vertices of tiny faces.
+    returns None if less than 3 vertices are left.
+    """
+    result = []
+    for index in indices:
+        if not result or result[-1] != index:
+            result.append(index)
+    if len(result) > 1 and result[0] == result[-1]:
+        result.pop()
+    if len(result) < 3 or len(set(result)) < len(result):
+        return None
+    return result
+
+
+class MeshData(object):
+    """
+    Flat vertex, edge and polygon buffers for one mesh.
+
+    the layout matches what blender expects for `foreach_set`:
+    - coords: x, y, z per vertex
+    - loops: vertex index per polygon corner
+    - loop_starts / loop_totals: first loop and loop count per polygon
+    - edges: two vertex indices per loose edge
+    - matindex: number of polygons per FreeCAD face (face to material relationship)
+
+    coordinates are collected as double to keep the welding exact.
+    they are converted to float32 when written to blender.
+    """
+
+    def __init__(self, weld_tolerance=0.0):
+        """Init."""
+        self.coords = array("d")
+        self.loops = array("i")
+        self.loop_starts = array("i")
+        self.loop_totals = array("i")
+        self.edges = array("i")
+        self.matindex = []
+        self.vert_pool = VertexPool(self.coords, tolerance=weld_tolerance)
+
+    @property
+    def vertex_count(self):
+        """Number of vertices."""
+        return len(self.coords) // 3
+
+    @property
+    def polygon_count(self):
+        """Number of polygons."""
+        return len(self.loop_starts)
+
+    @property
+    def loop_count(self):
+        """Number of polygon corners."""
+        return len(self.loops)
+
+    @property
+    def edge_count(self):
+        """Number of loose edges."""
+        return len(self.edges) // 2
+
+    def has_geometry(self):
+        """Check if there is anything to create a mesh from."""
+        return self.vertex_count > 0 and (self.polygon_count > 0 or self.edge_count > 0)
+
+    def add_vertex(self, x, y, z):
+        """Add (welded) vertex and return its index."""
+        return self.vert_pool.add(x, y, z)
+
+    def add_polygon(self, indices):
+        """Add polygon - return False if it collapsed and was skipped."""
+        indices = clean_face_indices(indices)
+        if not indices:
+            return False
+        self.loop_starts.append(len(self.loops))
+        self.loop_totals.append(len(indices))
+        self.loops.extend(indices)
+        return True
+
+    def add_edge(self, index_a, index_b):
+        """Add loose edge."""
+        if index_a != index_b:
+            self.edges.append(index_a)
+            self.edges.append(index_b)
+
+    def add_polyline(self, indices):
+        """Add loose edges between the consecutive vertex indices."""
+        edges = []
+        for index_a, index_b in zip(indices, indices[1:]):
+            if index_a != index_b:
+                edges.append(index_a)
+                edges.append(index_b)
+        self.edges.extend(edges)
+
+    def transform(self, matrix):
+        """
+        Transform all vertices by a 4x4 matrix (16 values, row major).
+
+        call after all vertices are added -
+        the vertex lookup is not updated.
+        """
+        if not self.vertex_count:
+            return
+        m = matrix
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        if np is not None:
+            m = np.array(matrix, dtype=np.float64).reshape(4, 4)
+            coords = np.frombuffer(self.coords, dtype=np.float64).reshape(-1, 3)
+            coords[:] = coords @ m[:3, :3].T + m[:3, 3]
+            # release the buffer - so the array can grow again.
+            del coords
+            return
+        coords = self.coords
+        for i in range(0, len(coords), 3):
+            x, y, z = coords[i], coords[i + 1], coords[i + 2]
+            coords[i] = m[0] * x + m[1] * y + m[2] * z + m[3]
+            coords[i + 1] = m[4] * x + m[5] * y + m[6] * z + m[7]
+            coords[i + 2] = m[8] * x + m[9] * y + m[10] * z + m[11]
+
+    def get_buffers(self):
+        """Get the flat buffers as dict (without the vertex lookup)."""
+        return {
+            "coords": self.coords,
+            "loops": self.loops,
+            "loop_starts": self.loop_starts,
+            "loop_totals": self.loop_totals,
+            "edges": self.edges,
+            "matindex": self.matindex,
+        }
+
+    @classmethod
+    def from_buffers(cls, buffers):
+        """
+        Create MeshData from `get_buffers` result.
+
+        the buffers can be arrays or numpy views (see `meshbuffer`).
+        the vertex lookup is not rebuilt -
+        the result is meant to be consumed, not extended.
+        """
+        mesh_data = cls()
+        mesh_data.coords = buffers["coords"]
+        mesh_data.loops = buffers["loops"]
+        mesh_data.loop_starts = buffers["loop_starts"]
+        mesh_data.loop_totals = buffers["loop_totals"]
+        mesh_data.edges = buffers["edges"]
+        mesh_data.matindex = buffers["matindex"]
+        mesh_data.vert_pool = None
+        return mesh_data
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Import phase profiler with per-object timing.
+
+optional the profiler records trace events of the whole (recursive) import.
+these are written in the Chrome trace-event format -
+open them in chrome://tracing, https://ui.perfetto.dev or https://www.speedscope.app
+"""
+
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+
+# shared no-op context for the disabled profiler
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+class ImportProfiler(object):
+    """
+    Collect timings of the import.
+
+    - phase totals (FreeCAD open, recompute, tessellation, mesh build, ...)
+      phases can be nested - every phase total is inclusive.
+    - per object timings of `import_obj`
+      `self_time` excludes the time spent in sub objects.
+    - counters for created data blocks.
+
+    - trace events (if `trace` is set)
+      every phase, object and traced method is a complete event ("ph": "X").
+
+    when disabled all methods are cheap no-ops.
+
+    all times use `clock` - the time between `pause` and `resume`
+    (the non-blocking import waiting for its next timer event) is left out.
+    """
+
+    def __init__(self, enabled=False, trace=False):
+        """Init."""
+        self.enabled = enabled
+        self.trace = trace
+        self.reset()
+
+    def reset(self):
+        """Reset all collected data."""
+        self.idle_time = 0.0
+        self.pause_time = None
+        self.start_time = self.clock()
+        self.total_time = 0.0
+        self.phase_totals = {}
+        self.phase_calls = {}
+        self.objects = []
+        self.object_stack = []
+        self.counts = {}
+        self.trace_events = []
+
+    def clock(self):
+        """Get perf_counter time without the paused time."""
+        return time.perf_counter() - self.idle_time
+
+    def pause(self):
+        """Stop the clock (open objects and phases do not count the pause)."""
+        if self.pause_time is None:
+            self.pause_time = time.perf_counter()
+
+    def resume(self):
+        """Continue the clock after `pause`."""
+        if self.pause_time is not None:
+            self.idle_time += time.perf_counter() - self.pause_time
+            self.pause_time = None
+
+    def finish(self):
+        """Stop total timer."""
+        self.resume()
+        self.total_time = self.clock() - self.start_time
+
+    def add_trace_event(self, name, category, start, duration, args=None):
+        """Add complete trace event (times from `clock` in seconds)."""
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self.start_time) * 1000000,
+            "dur": duration * 1000000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        self.trace_events.append(event)
+
+    def span(self, name, category="function", **args):
+        """
+        Context manager to record a trace event.
+
+        yields the args dict - add sizes and results to it.
+        """
+        if not self.trace:
+            return _NULL_CONTEXT
+        return self._span(name, category, args)
+
+    @contextlib.contextmanager
+    def _span(self, name, category, args):
+        start = self.clock()
+        try:
+            yield args
+        finally:
+            self.add_trace_event(
+                name, category, start, self.clock() - start, args
+            )
+
+    def phase(self, name):
+        """Context manager to time a phase."""
+        if not (self.enabled or self.trace):
+            return _NULL_CONTEXT
+        return self._phase(name)
+
+    @contextlib.contextmanager
+    def _phase(self, name):
+        start = self.clock()
+        try:
+            yield
+        finally:
+            duration = self.clock() - start
+            self.phase_totals[name] = self.phase_totals.get(name, 0.0) + duration
+            self.phase_calls[name] = self.phase_calls.get(name, 0) + 1
+            if self.trace:
+                self.add_trace_event(name, "phase", start, duration)
+
+    def object(self, name, type_id=""):
+        """Context manager to time the import of one object."""
+        if not (self.enabled or self.trace):
+            return _NULL_CONTEXT
+        return self._object(name, type_id)
+
+    @contextlib.contextmanager
+    def _object(self, name, type_id):
+        entry = self.begin_object(name, type_id)
+        try:
+            yield entry
+        finally:
+            self.end_object(entry)
+
+    def begin_object(self, name, type_id=""):
+        """
+        Start timing the import of one object.
+
+        for imports that are split into tasks -
+        call `end_object` with the returned entry after its sub objects.
+        """
+        if not (self.enabled or self.trace):
+            return None
+        entry = {
+            "name": name,
+            "type": type_id,
+            "time": 0.0,
+            "self_time": 0.0,
+            "vertices": 0,
+            "faces": 0,
+        }
+        # (entry, [time of sub objects], start)
+        self.object_stack.append((entry, [0.0], self.clock()))
+        return entry
+
+    def end_object(self, entry):
+        """Stop timing the object started with `begin_object`."""
+        if entry is None:
+            return
+        _entry, child_time, start = self.object_stack.pop()
+        duration = self.clock() - start
+        entry["time"] = duration
+        entry["self_time"] = duration - child_time[0]
+        if self.object_stack:
+            self.object_stack[-1][1][0] += duration
+        self.objects.append(entry)
+        if self.trace:
+            self.add_trace_event(
+                entry["name"],
+                "object",
+                start,
+                duration,
+                {
+                    "type": entry["type"],
+                    "vertices": entry["vertices"],
+                    "faces": entry["faces"],
+                },
+            )
+
+    def set_object_info(self, **kwargs):
+        """Add info (vertices, faces, ...) to the current object."""
+        if self.object_stack:
+            self.object_stack[-1][0].update(kwargs)
+
+    def count(self, name, value=1):
+        """Increase counter."""
+        if self.enabled:
+            self.counts[name] = self.counts.get(name, 0) + value
+
+    def get_summary(self, top_n=10):
+        """Get summary as dict."""
+        slowest = sorted(self.objects, key=lambda entry: entry["self_time"], reverse=True)
+        return {
+            "total_time": self.total_time,
+            "phases": {
+                name: {"time": total, "calls": self.phase_calls[name]}
+                for name, total in sorted(
+                    self.phase_totals.items(), key=lambda item: item[1], reverse=True
+                )
+            },
+            "object_count": len(self.objects),
+            "slowest_objects": slowest[:top_n],
+            "counts": dict(self.counts),
+        }
+
+    def format_summary(self, top_n=10):
+        """Get summary as list of text lines."""
+        summary = self.get_summary(top_n)
+        lines = ["import profile: total {:.3f}s".format(summary["total_time"])]
+        lines.append("phases:")
+        for name, phase in summary["phases"].items():
+            lines.append(
+                "  {:<20} {:>9.3f}s  ({} calls)".format(name, phase["time"], phase["calls"])
+            )
+        lines.append(
+            "slowest {} of {} objects (self time):".format(
+                len(summary["slowest_objects"]), summary["object_count"]
+            )
+        )
+        for entry in summary["slowest_objects"]:
+            lines.append(
+                "  {:<30} {:>9.3f}s  (total {:.3f}s)  {} verts  {} faces  <{}>".format(
+                    entry["name"],
+                    entry["self_time"],
+                    entry["time"],
+                    entry["vertices"],
+                    entry["faces"],
+                    entry["type"],
+                )
+            )
+        lines.append("created:")
+        for name, value in sorted(summary["counts"].items()):
+            lines.append("  {:<20} {:>6}".format(name, value))
+        return lines
+
+    def write_json(self, path, top_n=10):
+        """Write summary (and all object timings) as JSON file."""
+        summary = self.get_summary(top_n)
+        summary["objects"] = self.objects
+        with open(path, "w") as json_file:
+            json.dump(summary, json_file, indent=2)
+        return path
+
+    def write_trace(self, path):
+        """Write trace events as Chrome trace-event JSON file."""
+        events = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": os.getpid(),
+                "args": {"name": "FreeCAD import"},
+            }
+        ]
+        events.extend(self.trace_events)
+        with open(path, "w") as json_file:
+            json.dump(
+                {"traceEvents": events, "displayTimeUnit": "ms"}, json_file
+            )
+        return path
+
+
+def get_func_data_args(func_data):
+    """Get trace args (object name, type, mesh size) from func_data."""
+    args = {}
+    obj = func_data.get("obj", None)
+    if obj is not None:
+        args["object"] = obj.Name
+        args["label"] = obj.Label
+        args["type"] = obj.TypeId
+    mesh_data = func_data.get("mesh_data", None)
+    if mesh_data is not None and mesh_data.has_geometry():
+        args["vertices"] = mesh_data.vertex_count
+        args["faces"] = mesh_data.polygon_count
+    return args
+
+
+def traced(method):
+    """
+    Record a trace event for every call of an `ImportFcstd` method.
+
+    if the first (or the keyword) argument is a func_data dict
+    the object name, type and mesh size are added to the event.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.profiler.trace:
+            return method(self, *args, **kwargs)
+        func_data = kwargs.get("func_data", None)
+        if func_data is None and args and isinstance(args[0], dict):
+            func_data = args[0]
+        with self.profiler.span(method.__name__) as trace_args:
+            if func_data is not None:
+                trace_args.update(get_func_data_args(func_data))
+            result = method(self, *args, **kwargs)
+            if func_data is not None:
+                trace_args.update(get_func_data_args(func_data))
+            return result
+
+    return wrapper
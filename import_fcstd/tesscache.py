@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Persistent on-disk tessellation cache.
+
+every entry is a `meshbuffer` file with the tessellation result of one object.
+the key is a hash of the shape content (BREP)
+and all options that change the tessellation result.
+the least recently used entries are removed if the cache gets too big.
+"""
+
+import hashlib
+import json
+import os
+
+from .. import blender_helper as b_helper
+from . import meshbuffer
+from .meshdata import MeshData
+
+log = b_helper.get_logger(__name__, propagate=True)
+
+
+# increase if the tessellation code changes its results
+CACHE_VERSION = 3
+FILE_EXTENSION = ".fcmb"
+ENTRY_NAME = "mesh"
+
+# config keys that change the tessellation result
+KEY_CONFIG_KEYS = (
+    "tessellation",
+    "tessellation_adaptive",
+    "triangulate_meshes",
+    "placement",
+    "weld_tolerance",
+)
+# only used with tessellation_adaptive
+ADAPTIVE_CONFIG_KEYS = (
+    "tessellation_relative",
+    "tessellation_min",
+    "tessellation_max",
+)
+
+
+def get_shape_hash(shape):
+    """Get stable content hash of shape (the hashCode changes on every file opening)."""
+    return hashlib.sha1(shape.exportBrepToString().encode("utf-8")).hexdigest()
+
+
+def get_cache_key(obj, config, shape_hash=None):
+    """Get cache key for obj tessellated with config."""
+    if shape_hash is None:
+        shape_hash = get_shape_hash(obj.Shape)
+    key_config = {key: config[key] for key in KEY_CONFIG_KEYS}
+    if config["tessellation_adaptive"]:
+        key_config.update({key: config[key] for key in ADAPTIVE_CONFIG_KEYS})
+    key_data = {
+        "version": CACHE_VERSION,
+        "shape": shape_hash,
+        "config": key_config,
+    }
+    if config["placement"]:
+        # the inverse object placement is applied to the shape
+        key_data["placement"] = list(obj.Placement.toMatrix().A)
+    return hashlib.sha1(json.dumps(key_data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class TessellationCache(object):
+    """
+    Tessellation cache in a directory.
+
+    loaded MeshData are views into memory mapped files.
+    call `close` after the blender meshes are created.
+    """
+
+    def __init__(self, cache_dir, max_size=1024 * 1024 * 1024):
+        """Init."""
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.buffer_files = []
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_path(self, key):
+        """Get file path for key."""
+        return os.path.join(self.cache_dir, key + FILE_EXTENSION)
+
+    def __contains__(self, key):
+        """Check if key is cached."""
+        return os.path.exists(self.get_path(key))
+
+    def get(self, key):
+        """Get MeshData for key - or None."""
+        path = self.get_path(key)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        try:
+            buffer_file = meshbuffer.MeshBufferFile(path)
+            mesh_data = MeshData.from_buffers(buffer_file.get_buffers(ENTRY_NAME))
+        except (OSError, ValueError, KeyError):
+            # broken entry - remove it.
+            self.remove(path)
+            self.misses += 1
+            return None
+        self.buffer_files.append(buffer_file)
+        # mark as recently used
+        os.utime(path)
+        self.hits += 1
+        return mesh_data
+
+    def put(self, key, mesh_data):
+        """Store MeshData for key."""
+        path = self.get_path(key)
+        tmp_path = "{}.{}.tmp".format(path, os.getpid())
+        try:
+            meshbuffer.write_mesh_buffers(tmp_path, {ENTRY_NAME: mesh_data})
+            os.replace(tmp_path, path)
+        except OSError as e:
+            log.warning("tessellation cache: unable to write '{}': {}", path, e)
+            self.remove(tmp_path)
+
+    def remove(self, path):
+        """Remove file - ignore errors."""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_size."""
+        entries = []
+        total_size = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(FILE_EXTENSION):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+        removed = 0
+        entries.sort()
+        for _mtime, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            self.remove(path)
+            total_size -= size
+            removed += 1
+        return removed
+
+    def close(self):
+        """Release mapped files and evict old entries."""
+        for buffer_file in self.buffer_files:
+            buffer_file.close()
+        self.buffer_files = []
+        return self.evict()
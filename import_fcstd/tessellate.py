@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Convert FreeCAD shapes to flat mesh buffers.
+
+this module does not use `bpy` -
+so it can run inside blender and in the standalone tessellation worker.
+all functions fill a `meshdata.MeshData` instance.
+with the placement option the vertices are in the object coordinate system.
+
+config keys used:
+- tessellation
+- tessellation_adaptive, tessellation_relative, tessellation_min, tessellation_max
+- triangulate_meshes
+- placement
+"""
+
+import math
+
+
+# angular deflection limits of the adaptive tessellation (radians)
+ANGULAR_DEFLECTION_MIN = 0.05
+ANGULAR_DEFLECTION_MAX = 0.5
+# smallest linear deflection - OCC needs a positive value.
+LINEAR_DEFLECTION_MIN = 0.001
+
+
+def get_adaptive_deflection(diagonal, config):
+    """
+    Get (linear, angular) deflection for an object of the given size.
+
+    the linear deflection is a fraction of the bounding box diagonal
+    (clamped to tessellation_min / tessellation_max).
+    the angular deflection is the angle of a chord with this deflection
+    on a circle with half the diagonal as radius -
+    so the curves of big objects get enough segments
+    and small objects are not over-tessellated.
+    """
+    linear = diagonal * config["tessellation_relative"]
+    linear = min(max(linear, config["tessellation_min"]), config["tessellation_max"])
+    radius = diagonal / 2
+    angular = ANGULAR_DEFLECTION_MAX
+    if radius > linear:
+        angular = 2 * math.acos(1 - linear / radius)
+    angular = min(max(angular, ANGULAR_DEFLECTION_MIN), ANGULAR_DEFLECTION_MAX)
+    return linear, angular
+
+
+def get_shape_config(shape, config):
+    """Get config with the (adaptive) tessellation values for shape."""
+    if not config.get("tessellation_adaptive", False):
+        return config
+    diagonal = shape.BoundBox.DiagonalLength
+    if diagonal <= 0:
+        return config
+    linear, angular = get_adaptive_deflection(diagonal, config)
+    return dict(config, tessellation=linear, angular_deflection=angular)
+
+
+def is_curved_edge(edge):
+    """Check if edge is not a straight line."""
+    import Part
+
+    return not isinstance(edge.Curve, (Part.Line, Part.LineSegment))
+
+
+def hascurves(shape, shape_edges=None):
+    """Check if shape has curves."""
+    if shape_edges is not None:
+        return shape_edges.has_curves(shape)
+    for e in shape.Edges:
+        if is_curved_edge(e):
+            return True
+    return False
+
+
+class ShapeEdges(object):
+    """
+    Edge classification of one shape.
+
+    the curve type of every edge is computed only once
+    and the edges that belong to faces are collected in a set.
+    edges are identified by `hashCode` (the same for the edge in every face).
+    """
+
+    def __init__(self):
+        """Init."""
+        # hashCode → curved
+        self.curved = {}
+        # hashCodes of the edges that are part of a face
+        self.face_edges = set()
+
+    def is_curved(self, edge):
+        """Check if edge is not a straight line (cached)."""
+        key = edge.hashCode()
+        curved = self.curved.get(key, None)
+        if curved is None:
+            curved = is_curved_edge(edge)
+            self.curved[key] = curved
+        return curved
+
+    def has_curves(self, shape):
+        """Check if shape has curves."""
+        for e in shape.Edges:
+            if self.is_curved(e):
+                return True
+        return False
+
+    def add_face(self, face):
+        """Mark the edges of face as face edges."""
+        for e in face.Edges:
+            self.face_edges.add(e.hashCode())
+
+    def is_face_edge(self, edge):
+        """Check if edge is part of a face."""
+        return edge.hashCode() in self.face_edges
+
+
+def discretize_edge(edge, tessellation):
+    """
+    Get points along a curved edge.
+
+    the distance between the curve and the line segments
+    is at most the tessellation value (like for the faces).
+    """
+    import Part
+
+    try:
+        return edge.discretize(Deflection=max(tessellation, LINEAR_DEFLECTION_MIN))
+    except Part.OCCError:
+        # degenerated or very short edges
+        return edge.discretize(2)
+
+
+def handle_shape_edge(mesh_data, edge, shape_edges=None, tessellation=0.1):
+    """Handle edges that are not part of a face."""
+    if shape_edges is None:
+        curved = hascurves(edge)
+    else:
+        curved = shape_edges.is_curved(edge)
+    if curved:
+        dv = discretize_edge(edge, tessellation)
+        mesh_data.add_polyline([mesh_data.add_vertex(v.x, v.y, v.z) for v in dv])
+    else:
+        e = []
+        for vert in edge.Vertexes:
+            e.append(mesh_data.add_vertex(vert.X, vert.Y, vert.Z))
+        if len(e) == 2:
+            mesh_data.add_edge(*e)
+
+
+def face_needs_triangulation(face, shape_edges=None):
+    """Check if face has holes or is curved."""
+    import Part
+
+    return (
+        (len(face.Wires) > 1)
+        or (not isinstance(face.Surface, Part.Plane))
+        or hascurves(face, shape_edges)
+    )
+
+
+def get_face_triangles(shape, faces, tessellation, angular_deflection=None):
+    """
+    Triangulate the given faces of shape with one call.
+
+    if not all faces of shape are given a compound of them is meshed.
+    MeshPart creates one mesh segment per face -
+    so the face → triangles relationship (the materials) is kept.
+    returns (points, [triangles of faces[0], triangles of faces[1], ...])
+    or None if MeshPart is not available or the segments do not match the faces.
+    """
+    try:
+        import MeshPart
+    except ImportError:
+        return None
+    import Part
+
+    if len(faces) != len(shape.Faces):
+        shape = Part.makeCompound(faces)
+    kwargs = {}
+    if angular_deflection is not None:
+        kwargs["AngularDeflection"] = angular_deflection
+    mesh = MeshPart.meshFromShape(
+        Shape=shape, LinearDeflection=tessellation, Segments=True, **kwargs
+    )
+    if mesh.countSegments() != len(faces):
+        return None
+    points, facets = mesh.Topology
+    face_triangles = [
+        [facets[i] for i in mesh.getSegment(index)] for index in range(len(faces))
+    ]
+    return points, face_triangles
+
+
+def add_triangles(mesh_data, points, triangles, point_indices):
+    """
+    Add triangles - return the number of added polygons.
+
+    point_indices maps the indices of points to our pool indices
+    (only the used points are added).
+    """
+    face_count = 0
+    for triangle in triangles:
+        indices = []
+        for pi in triangle:
+            vi = point_indices.get(pi, None)
+            if vi is None:
+                v = points[pi]
+                vi = mesh_data.add_vertex(v.x, v.y, v.z)
+                point_indices[pi] = vi
+            indices.append(vi)
+        if mesh_data.add_polygon(indices):
+            face_count += 1
+    return face_count
+
+
+def convert_face_to_polygon(
+    mesh_data, face, shape_edges, config, needs_triangulation=None, triangles=None
+):
+    """
+    Convert face to polygons.
+
+    `triangles` is the (points, triangles, point_indices) result
+    of the grouped tessellation for this face.
+    """
+    if needs_triangulation is None:
+        needs_triangulation = face_needs_triangulation(face, shape_edges)
+    if needs_triangulation and triangles is not None:
+        mesh_data.matindex.append(add_triangles(mesh_data, *triangles))
+    elif needs_triangulation:
+        # face has holes or is curved, so we need to triangulate it
+        rawdata = face.tessellate(config["tessellation"])
+        # map tessellation local indices to our pool indices
+        vert_indices = [mesh_data.add_vertex(v.x, v.y, v.z) for v in rawdata[0]]
+        face_count = 0
+        for f in rawdata[1]:
+            if mesh_data.add_polygon([vert_indices[vi] for vi in f]):
+                face_count += 1
+        mesh_data.matindex.append(face_count)
+    else:
+        f = []
+        ov = face.OuterWire.OrderedVertexes
+        for v in ov:
+            f.append(mesh_data.add_vertex(v.X, v.Y, v.Z))
+        # FreeCAD doesn't care about vertex order.
+        # Make sure our loop goes clockwise
+        c = face.CenterOfMass
+        v1 = ov[0].Point.sub(c)
+        v2 = ov[1].Point.sub(c)
+        n = face.normalAt(0, 0)
+        if (v1.cross(v2)).getAngle(n) > 1.57:
+            # inverting vertex order
+            # if the direction is counterclockwise
+            f.reverse()
+        if mesh_data.add_polygon(f):
+            mesh_data.matindex.append(1)
+        else:
+            mesh_data.matindex.append(0)
+    shape_edges.add_face(face)
+
+
+def handle_shape_faces(mesh_data, shape, shape_edges, config):
+    """
+    Convert faces to polygons.
+
+    all faces that need triangles are tessellated together in one call
+    (per face tessellation has a big overhead in OCC).
+    """
+    faces = shape.Faces
+    if config["triangulate_meshes"]:
+        needs_triangulation = [True] * len(faces)
+    else:
+        # write FreeCAD faces as polygons when possible
+        needs_triangulation = [
+            face_needs_triangulation(face, shape_edges) for face in faces
+        ]
+    triangulate_indices = [
+        index for index, needs in enumerate(needs_triangulation) if needs
+    ]
+    # face index → triangles
+    face_triangles = {}
+    points = None
+    # a single face is faster tessellated on its own -
+    # but only MeshPart uses the (adaptive) angular deflection.
+    angular_deflection = config.get("angular_deflection", None)
+    grouped_min = 1 if angular_deflection is None else 0
+    if config["triangulate_meshes"] or len(triangulate_indices) > grouped_min:
+        grouped = get_face_triangles(
+            shape,
+            [faces[index] for index in triangulate_indices],
+            config["tessellation"],
+            angular_deflection,
+        )
+        if grouped is not None:
+            points = grouped[0]
+            face_triangles = dict(zip(triangulate_indices, grouped[1]))
+    if points is None and config["triangulate_meshes"]:
+        # triangulate and make faces
+        # (without MeshPart the face → material relationship is lost)
+        rawdata = shape.tessellate(config["tessellation"])
+        vert_indices = [mesh_data.add_vertex(v.x, v.y, v.z) for v in rawdata[0]]
+        for f in rawdata[1]:
+            mesh_data.add_polygon([vert_indices[vi] for vi in f])
+        for face in faces:
+            shape_edges.add_face(face)
+        return
+    point_indices = {}
+    for index, face in enumerate(faces):
+        triangles = None
+        if index in face_triangles:
+            triangles = (points, face_triangles[index], point_indices)
+        convert_face_to_polygon(
+            mesh_data,
+            face,
+            shape_edges,
+            config,
+            needs_triangulation=needs_triangulation[index],
+            triangles=triangles,
+        )
+
+
+def create_mesh_from_shape(mesh_data, obj, config):
+    """Create mesh from shape of obj."""
+    # curve types and the edges that belong to a face
+    shape_edges = ShapeEdges()
+    shape = obj.Shape
+    config = get_shape_config(shape, config)
+    # hashCode changes on every file opening :-(
+    if shape.Faces:
+        handle_shape_faces(mesh_data, shape, shape_edges, config)
+    # Treat remaining edges (that are not in faces)
+    for edge in shape.Edges:
+        if not shape_edges.is_face_edge(edge):
+            handle_shape_edge(
+                mesh_data, edge, shape_edges, tessellation=config["tessellation"]
+            )
+    if config["placement"]:
+        apply_inverse_placement(mesh_data, obj)
+    return shape
+
+
+def apply_inverse_placement(mesh_data, obj):
+    """
+    Move the vertices into the object coordinate system.
+
+    the blender object gets the placement -
+    this is cheaper than tessellating a copy of the shape with reset placement.
+    """
+    mesh_data.transform(obj.Placement.inverse().toMatrix().A)
+
+
+def create_mesh_from_mesh(mesh_data, obj, config):
+    """Create mesh from the mesh of a Mesh::Feature obj."""
+    t = obj.Mesh.Topology
+    for v in t[0]:
+        mesh_data.coords.extend((v.x, v.y, v.z))
+    for f in t[1]:
+        mesh_data.add_polygon(f)
+    if config["placement"]:
+        apply_inverse_placement(mesh_data, obj)
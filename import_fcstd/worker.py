@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Standalone FreeCAD tessellation worker.
+
+`workerpool` starts this script as separate python process:
+    python worker.py job.json
+
+it loads FreeCAD, opens the document and tessellates the requested objects.
+the flat mesh buffers are written to the result file of the job
+(see `meshbuffer` for the format).
+this keeps OpenCASCADE out of the blender process
+and allows to use all cores.
+
+this file runs outside of blender -
+so it only imports the `bpy` free modules next to it.
+"""
+
+import json
+import os
+import sys
+import traceback
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import freecad_helper as fc_helper  # noqa: E402
+import guidata  # noqa: E402
+import meshbuffer  # noqa: E402
+import meshdata  # noqa: E402
+import tessellate  # noqa: E402
+
+
+def append_path(path, sub=""):
+    """Add path to sys.path."""
+    if path and sub:
+        path = os.path.join(path, sub)
+    if path and os.path.exists(path):
+        if os.path.isfile(path):
+            path = os.path.dirname(path)
+        if path not in sys.path:
+            sys.path.append(path)
+    else:
+        print("Path does not exist. Please check! '{}'".format(path), file=sys.stderr)
+
+
+def import_freecad(job):
+    """Import FreeCAD and the additional modules."""
+    append_path(job["path_to_freecad"])
+    append_path(job["path_to_system_packages"])
+    import FreeCAD
+
+    path_base = FreeCAD.getResourceDir()
+    append_path(path_base, "Ext")
+    append_path(path_base, "Mod")
+    # imported for their side effects (register the shape and feature types)
+    import Part  # noqa: F401
+
+    try:
+        # needed to restore the python features of these workbenches
+        import Draft  # noqa: F401
+        import Arch  # noqa: F401
+    except Exception as e:
+        print("unable to import additional modules:", e, file=sys.stderr)
+    return FreeCAD
+
+
+def report(level, message, pre_line=""):
+    """Write importer style report to the worker log."""
+    print("{}{}".format(pre_line, message), file=sys.stderr)
+
+
+def select_objects(doc, job):
+    """
+    Select the shape objects of this worker.
+
+    same selection as `ImportFcstd.start_workers`
+    (the objects reachable from the visible root objects) -
+    but without the tessellation cache and unchanged mesh checks.
+    every worker takes every n-th object.
+    """
+    typeid_filter_list = job["typeid_filter_list"]
+    graph = fc_helper.ObjectGraph(doc)
+    root_objects, _ = fc_helper.get_root_objects(
+        doc, filter_list=typeid_filter_list, graph=graph
+    )
+    gui_data = {}
+    if job["skiphidden"]:
+        gui_data = guidata.load_guidata(job["filename"], report) or {}
+
+    def is_visible(obj, visibility):
+        # same as `ImportFcstd.check_obj_visibility_with_skiphidden`
+        if not job["skiphidden"]:
+            return True
+        if visibility is not None:
+            return visibility
+        return gui_data.get(obj.Name, {}).get("Visibility", True) is not False
+
+    object_names = []
+    for obj in fc_helper.get_reachable_objects(root_objects, graph, is_visible):
+        if (
+            obj.Document is doc
+            and obj.isDerivedFrom("Part::Feature")
+            and obj.TypeId not in typeid_filter_list
+            # arrays are imported element by element
+            and not hasattr(obj, "ElementList")
+        ):
+            object_names.append(obj.Name)
+    return object_names[job["worker_index"]::job["worker_count"]]
+
+
+def tessellate_objects(doc, object_names, config):
+    """Tessellate objects - return MeshData and errors per object name."""
+    results = {}
+    errors = {}
+    for name in object_names:
+        obj = doc.getObject(name)
+        if obj is None:
+            errors[name] = "object not found."
+            continue
+        mesh_data = meshdata.MeshData(weld_tolerance=config["weld_tolerance"])
+        try:
+            tessellate.create_mesh_from_shape(mesh_data, obj, config)
+        except Exception as e:
+            errors[name] = str(e)
+            continue
+        results[name] = mesh_data
+    return results, errors
+
+
+def run(job):
+    """Run tessellation job."""
+    FreeCAD = import_freecad(job)
+    doc = FreeCAD.open(job["filename"])
+    try:
+        fc_helper.recompute_document(
+            doc, job.get("recompute", fc_helper.RECOMPUTE_TOUCHED)
+        )
+        object_names = job["object_names"]
+        if object_names is None:
+            object_names = select_objects(doc, job)
+        results, errors = tessellate_objects(doc, object_names, job["config"])
+    finally:
+        FreeCAD.closeDocument(doc.Name)
+    meshbuffer.write_mesh_buffers(job["result_path"], results)
+    with open(job["error_path"], "w") as error_file:
+        json.dump(errors, error_file)
+
+
+def main():
+    """Main."""
+    with open(sys.argv[1], "r") as job_file:
+        job = json.load(job_file)
+    exit_code = 0
+    try:
+        run(job)
+    except Exception:
+        traceback.print_exc()
+        exit_code = 1
+    sys.stdout.flush()
+    sys.stderr.flush()
+    # skip the interpreter teardown:
+    # unloading the OpenCASCADE libraries can crash on exit.
+    os._exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
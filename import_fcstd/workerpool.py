@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Pool of FreeCAD tessellation worker processes."""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from . import meshbuffer
+from .meshdata import MeshData
+
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker.py")
+
+# config keys the worker needs to tessellate like the importer does.
+WORKER_CONFIG_KEYS = (
+    "tessellation",
+    "tessellation_adaptive",
+    "tessellation_relative",
+    "tessellation_min",
+    "tessellation_max",
+    "triangulate_meshes",
+    "placement",
+    "weld_tolerance",
+)
+
+
+def get_worker_count(requested, job_count):
+    """Get number of worker processes to start."""
+    worker_count = requested
+    if worker_count <= 0:
+        worker_count = os.cpu_count() or 1
+    return max(1, min(worker_count, job_count))
+
+
+def split_jobs(object_names, worker_count):
+    """Distribute object names round robin to the workers."""
+    chunks = [[] for _ in range(worker_count)]
+    for index, name in enumerate(object_names):
+        chunks[index % worker_count].append(name)
+    return [chunk for chunk in chunks if chunk]
+
+
+def get_python_executable():
+    """Get python executable to run the worker with."""
+    # since blender 2.91 sys.executable is the bundled python.
+    # FreeCAD needs the same python version anyway.
+    return sys.executable
+
+
+class WorkerResults(object):
+    """
+    Tessellation results of the worker processes.
+
+    the MeshData buffers are views into the memory mapped result files.
+    call `close` after the blender meshes are created.
+    """
+
+    def __init__(self, tmp_dir=None):
+        """Init."""
+        self.tmp_dir = tmp_dir
+        self.buffer_files = []
+        self.mesh_data_by_name = {}
+
+    def __contains__(self, name):
+        """Check if object was tessellated."""
+        return name in self.mesh_data_by_name
+
+    def __getitem__(self, name):
+        """Get MeshData for object."""
+        return self.mesh_data_by_name[name]
+
+    def __len__(self):
+        """Number of tessellated objects."""
+        return len(self.mesh_data_by_name)
+
+    def discard(self, name):
+        """Forget the MeshData of object (its buffer stays mapped until `close`)."""
+        self.mesh_data_by_name.pop(name, None)
+
+    def names(self):
+        """Get the names of the tessellated objects."""
+        return list(self.mesh_data_by_name.keys())
+
+    def add_buffer_file(self, path):
+        """Map result file and add its objects."""
+        buffer_file = meshbuffer.MeshBufferFile(path)
+        self.buffer_files.append(buffer_file)
+        for name in buffer_file.names():
+            self.mesh_data_by_name[name] = MeshData.from_buffers(
+                buffer_file.get_buffers(name)
+            )
+
+    def close(self):
+        """Release mapped files and remove temporary directory."""
+        self.mesh_data_by_name = {}
+        for buffer_file in self.buffer_files:
+            buffer_file.close()
+        self.buffer_files = []
+        if self.tmp_dir:
+            # on windows mapped files can not be removed.
+            # these are left for the system temp cleanup.
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+            self.tmp_dir = None
+
+
+class WorkerJobs(object):
+    """
+    Running tessellation worker processes of one file.
+
+    `collect` waits for the workers and returns the WorkerResults.
+    """
+
+    def __init__(self, filename, tmp_dir):
+        """Init."""
+        self.filename = filename
+        self.tmp_dir = tmp_dir
+        self.workers = []
+
+    def start(self, job):
+        """Write job file and start worker process."""
+        index = len(self.workers)
+        job["result_path"] = os.path.join(self.tmp_dir, "result_{}.fcmb".format(index))
+        job["error_path"] = os.path.join(self.tmp_dir, "errors_{}.json".format(index))
+        job_path = os.path.join(self.tmp_dir, "job_{}.json".format(index))
+        with open(job_path, "w") as job_file:
+            json.dump(job, job_file)
+        log_file = open(os.path.join(self.tmp_dir, "log_{}.txt".format(index)), "w+")
+        process = subprocess.Popen(
+            [get_python_executable(), WORKER_SCRIPT, job_path],
+            stdin=subprocess.DEVNULL,
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+        )
+        self.workers.append((process, job, log_file))
+
+    def is_done(self):
+        """Check (without waiting) if all workers have finished."""
+        return all(process.poll() is not None for process, _job, _log in self.workers)
+
+    def collect(self, report=None):
+        """Wait for all workers and map their results."""
+        worker_results = WorkerResults(self.tmp_dir)
+        for process, job, log_file in self.workers:
+            process.wait()
+            log_file.seek(0)
+            log = log_file.read()
+            log_file.close()
+            if process.returncode != 0 or not os.path.exists(job["result_path"]):
+                if report:
+                    report(
+                        {"WARNING"},
+                        "tessellation worker failed (exit code {}). "
+                        "the objects will be tessellated inside blender.\n{}"
+                        "".format(process.returncode, log),
+                    )
+                continue
+            worker_results.add_buffer_file(job["result_path"])
+            if report:
+                with open(job["error_path"], "r") as error_file:
+                    errors = json.load(error_file)
+                for name, error in errors.items():
+                    report(
+                        {"WARNING"},
+                        "tessellation worker: '{}' failed: {}".format(name, error),
+                    )
+        self.workers = []
+        return worker_results
+
+    def cancel(self):
+        """Stop the workers and remove their files."""
+        for process, _job, log_file in self.workers:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            log_file.close()
+        self.workers = []
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+def start_tessellation(
+    *,
+    filename,
+    object_names,
+    config,
+    worker_count=0,
+    path_to_freecad=None,
+    path_to_system_packages=None,
+    recompute="TOUCHED",
+    typeid_filter_list=None,
+    skiphidden=False,
+):
+    """
+    Start tessellation worker processes for one file.
+
+    every worker opens the document (recomputes it according to the
+    `recompute` policy) and handles a part of the objects.
+    if `object_names` is None the workers select the shape objects themselves
+    (reachable from the root objects - without the types in `typeid_filter_list`
+    and with `skiphidden` without the hidden objects) -
+    so the document does not need to be open in blender.
+    returns WorkerJobs.
+    """
+    job_base = {
+        "filename": filename,
+        "config": {key: config[key] for key in WORKER_CONFIG_KEYS},
+        "path_to_freecad": path_to_freecad,
+        "path_to_system_packages": path_to_system_packages,
+        "recompute": recompute,
+    }
+    worker_jobs = WorkerJobs(filename, tempfile.mkdtemp(prefix="fcstd_tessellation_"))
+    if object_names is None:
+        worker_count = get_worker_count(worker_count, os.cpu_count() or 1)
+        for index in range(worker_count):
+            job = dict(job_base)
+            job["object_names"] = None
+            job["typeid_filter_list"] = typeid_filter_list or []
+            job["skiphidden"] = skiphidden
+            job["worker_index"] = index
+            job["worker_count"] = worker_count
+            worker_jobs.start(job)
+    else:
+        chunks = split_jobs(
+            object_names, get_worker_count(worker_count, len(object_names))
+        )
+        for chunk in chunks:
+            job = dict(job_base)
+            job["object_names"] = chunk
+            worker_jobs.start(job)
+    return worker_jobs
+
+
+def tessellate_objects(
+    *,
+    filename,
+    object_names,
+    config,
+    worker_count=0,
+    path_to_freecad=None,
+    path_to_system_packages=None,
+    recompute="TOUCHED",
+    report=None,
+):
+    """
+    Tessellate objects in parallel worker processes.
+
+    returns WorkerResults (object name → MeshData).
+    objects that failed are not in the result -
+    the importer falls back to tessellate them itself.
+    """
+    if not object_names:
+        return WorkerResults()
+    worker_jobs = start_tessellation(
+        filename=filename,
+        object_names=object_names,
+        config=config,
+        worker_count=worker_count,
+        path_to_freecad=path_to_freecad,
+        path_to_system_packages=path_to_system_packages,
+        recompute=recompute,
+    )
+    return worker_jobs.collect(report)